@@ -1,5 +1,32 @@
 from src.benchmark import Benchmark
+from src.microbenchmark import Microbenchmark
 from src.utils import Helper
+from contextlib import redirect_stdout
+import argparse
+import json
+import sys
+import numpy as np
+
+STRUCTURES = ["AVL", "RB", "Treap", "ArrayAVL"]
+DISTRIBUTIONS = ["random", "skewed"]
+OPERATIONS = ["insert", "search"]
+# Comparisons run with --compare: the Benchmark method of each one, called with the selected distribution
+# when it compares the structures on a single one
+COMPARISONS = {
+    "bulk-build": lambda b, distrib_key: b.simulate_bulk_build(),
+    "order-stats": lambda b, distrib_key: b.compare_order_statistics(distrib_key),
+    "batch-merge": lambda b, distrib_key: b.simulate_batch_merge(distrib_key),
+    "batch-search": lambda b, distrib_key: b.simulate_batch_search(),
+    "deletion": lambda b, distrib_key: b.simulate_deletion(),
+    "priorities": lambda b, distrib_key: b.compare_priority_sources(distrib_key),
+    "snapshots": lambda b, distrib_key: b.measure_snapshots(distrib_key),
+    "concurrent-reads": lambda b, distrib_key: b.simulate_concurrent_reads(distrib_key=distrib_key),
+    "engines": lambda b, distrib_key: b.compare_engines(distrib_key),
+    "map-mode": lambda b, distrib_key: b.compare_map_mode(distrib_key),
+    "sharding": lambda b, distrib_key: b.compare_sharding(distrib_key),
+    "memory": lambda b, distrib_key: b.measure_memory(distrib_key),
+    "batch-insertion": lambda b, distrib_key: b.simulate_batch_insertion(),
+}
 
 def generate_dataset(size = 1000000):
     """
@@ -13,71 +40,280 @@ def generate_dataset(size = 1000000):
     """
     # Generate the dataset using Helper's method
     data = Helper.generate_datasets(size)
-    
+
     # Visualize the distribution of the dataset
     Helper.visualize_dataset_distribution(data)
-    
+
     # Save the generated dataset to a file
     Helper.save_dataset(data)
-    
+
     return data
 
-def simulate_insertion(b):
+def simulate_insertion(b, repeats=1, save=True, block_size=None):
     """
-    Simulates the insertion process for the Benchmark instance and plots the results.
+    Simulates the insertion process for the Benchmark instance, repeated to get stable curves.
+    The results of the Benchmark are the median of the cumulative times over the repeats.
 
     Parameters:
     b (Benchmark): The Benchmark object on which the insertion simulation is to be run.
-    
+    repeats (int): The number of times the simulation is run.
+    save (bool): Whether to save the median results in the results folder.
+    block_size (int): The number of insertions timed together, None to time every insertion.
+
     Returns:
-    None
+    dict: The summary of the insertion in the format:
+    { "random": { "AVL": {"total_seconds": float, "repeat_total_seconds": [float, ...]}, ...}, "skewed": {...}}
     """
-    # Run the insertion simulation and plot the insertion times
-    b.simulate_insertion()
-    b.plot_insert()
+    runs = []
+    for _ in range(repeats):
+        b.simulate_insertion(save=False, block_size=block_size)
+        runs.append({distrib_key: dict(structures) for distrib_key, structures in b.results_insertion.items()})
 
-def simulate_search(b, steps=100):
+    b.results_insertion = {distrib_key: {struc_key: np.median([run[distrib_key][struc_key] for run in runs], axis=0)
+                                         for struc_key in structures}
+                           for distrib_key, structures in b.results_insertion.items()}
+    if save:
+        Helper.save_insert_results(b.results_insertion, b.sizes_insertion)
+
+    return {distrib_key: {struc_key: {"total_seconds": float(times[-1]) if len(times) else 0.0,
+                                      "repeat_total_seconds": [float(run[distrib_key][struc_key][-1])
+                                                               for run in runs if len(times)]}
+                          for struc_key, times in structures.items()}
+            for distrib_key, structures in b.results_insertion.items()}
+
+def simulate_search(b, steps=100, sizes=None, distrib_key='random', repeats=1, save=True, harness=None):
     """
-    Simulates the search process for the Benchmark instance and plots the results.
+    Simulates the search process for the Benchmark instance, repeated to get stable times.
+    The results of the Benchmark are the median of the average search times over the repeats.
 
     Parameters:
     b (Benchmark): The Benchmark object on which the search simulation is to be run.
     steps (int): The number of steps to divide the dataset size for search simulation (default is 100).
-    
+    sizes (list of int): The dataset sizes to search, instead of equal steps.
+    distrib_key (str): The dataset distribution to search.
+    repeats (int): The number of times the simulation is run.
+    save (bool): Whether to save the median results in the results folder.
+    harness (Microbenchmark): Optional harness timing the searches with warmup and repeated trials.
+
     Returns:
-    None
+    dict: The summary of the search in the format:
+    { "distribution": str, "sizes": [int, ...], "average_seconds": { "AVL": [float, ...], ...},
+      "statistics": { "AVL": {"q1": [float, ...], "q3": [...], "ci_low": [...], "ci_high": [...]}, ...}}
+    The statistics are only given with a harness, and the average seconds are then the median times.
     """
-    # Run the search simulation and plot the search times
-    b.simulate_search(steps)
-    b.plot_search()
+    runs, stats_runs = [], []
+    for _ in range(repeats):
+        b.simulate_search(steps, sizes=sizes, distrib_key=distrib_key, save=False, harness=harness)
+        runs.append(dict(b.results_search))
+        stats_runs.append(dict(b.stats_search))
+
+    b.results_search = {struc_key: np.median([run[struc_key] for run in runs], axis=0) for struc_key in b.results_search}
+    b.stats_search = {struc_key: {stat: np.median([run[struc_key][stat] for run in stats_runs], axis=0) for stat in stats}
+                      for struc_key, stats in b.stats_search.items()}
+    if save:
+        Helper.save_search_results(b.results_search, b.sizes_search, b.stats_search)
+
+    summary = {"distribution": distrib_key, "sizes": b.sizes_search.tolist(),
+               "average_seconds": {struc_key: times.tolist() for struc_key, times in b.results_search.items()}}
+    if b.stats_search:
+        summary["statistics"] = {struc_key: {stat: values.tolist() for stat, values in stats.items()}
+                                 for struc_key, stats in b.stats_search.items()}
+    return summary
 
-def main():
+def simulate_parallel(b, workers, steps=10, distrib_key='random', save=True):
+    """
+    Runs the insertion and search simulations for the Benchmark instance on a pool of worker processes
+    (see `Benchmark.simulate_parallel`), once.
+
+    Parameters:
+    b (Benchmark): The Benchmark object on which the simulations are to be run.
+    workers (int): The maximum number of worker processes.
+    steps (int): The number of steps to divide the dataset size for search simulation.
+    distrib_key (str): The dataset distribution to search.
+    save (bool): Whether to save the results in the results folder.
+
+    Returns:
+    tuple: (dict: the summary of the insertion, in the format of simulate_insertion,
+            dict: the summary of the search, in the format of simulate_search)
+    """
+    b.simulate_parallel(steps, max_workers=workers, distrib_key=distrib_key, save=save)
+    insertion = {insert_key: {struc_key: {"total_seconds": float(times[-1]) if len(times) else 0.0,
+                                          "repeat_total_seconds": [float(times[-1])] if len(times) else []}
+                              for struc_key, times in structures.items()}
+                 for insert_key, structures in b.results_insertion.items()}
+    search = {"distribution": distrib_key, "sizes": b.sizes_search.tolist(),
+              "average_seconds": {struc_key: times.tolist() for struc_key, times in b.results_search.items()}}
+    return insertion, search
+
+def parse_args(argv=None):
+    """
+    Parses the command-line options of the benchmark.
+
+    Parameters:
+    argv (list of str): The options, None to read them from the command line.
+
+    Returns:
+    argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the insertion and search of the balanced BSTs.")
+    parser.add_argument("--dataset", default="data/dataset10",
+                        help="Binary dataset directory, or JSON dataset file (default: data/dataset10)")
+    parser.add_argument("--structures", nargs="+", choices=STRUCTURES, default=STRUCTURES,
+                        help="Structures to benchmark (default: all)")
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS, default=DISTRIBUTIONS,
+                        help="Distributions of the insertion simulation; the search uses the first one (default: both)")
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        help="Dataset sizes of the search simulation; the insertion uses the largest one "
+                             "(default: the full dataset, in --steps equal steps)")
+    parser.add_argument("--steps", type=int, default=10,
+                        help="Number of equal dataset sizes of the search simulation when --sizes is not given (default: 10)")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS,
+                        help="Simulations to run (default: both, or none when --compare is given without --workers)")
+    parser.add_argument("--compare", nargs="+", choices=list(COMPARISONS), default=[],
+                        help="Comparisons to run after the simulations, on the first distribution when they use one; "
+                             "their results are added to the summary")
+    parser.add_argument("--repeats", type=int, default=1,
+                        help="Number of runs of each simulation, whose median is reported (default: 1)")
+    parser.add_argument("--block-size", type=int,
+                        help="Time the insertions by blocks of this size, with one clock read pair per block "
+                             "(default: time every insertion)")
+    parser.add_argument("--trials", type=int,
+                        help="Time the searches with this number of trials per size, with the garbage collector "
+                             "disabled, and report their median and confidence interval (default: a single average)")
+    parser.add_argument("--warmup", type=int,
+                        help="Number of untimed searches before the trials (default: 5)")
+    parser.add_argument("--cpu", type=int, help="Pin the process to this CPU during the trials (Linux only)")
+    parser.add_argument("--workers", type=int,
+                        help="Run the insertion and search simulations once, on this number of worker processes "
+                             "(default: run them in this process)")
+    plots = parser.add_mutually_exclusive_group()
+    plots.add_argument("--plot-dir", help="Save the plots as PNG files in this directory instead of showing them")
+    plots.add_argument("--no-plots", action="store_true", help="Skip the plots and the complexity fits")
+    parser.add_argument("--no-save", action="store_true", help="Don't save the results in data/results")
+    parser.add_argument("--summary", help="Also write the JSON summary to this file")
+    args = parser.parse_args(argv)
+    if args.operations is None:
+        args.operations = [] if args.compare and args.workers is None else OPERATIONS
+
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+    if args.steps < 1:
+        parser.error("--steps must be at least 1")
+    if args.sizes and min(args.sizes) < 1:
+        parser.error("--sizes must be positive")
+    if args.block_size is not None and args.block_size < 1:
+        parser.error("--block-size must be at least 1")
+    if args.trials is not None and args.trials < 1:
+        parser.error("--trials must be at least 1")
+    if args.warmup is not None and args.warmup < 0:
+        parser.error("--warmup must not be negative")
+    if args.workers is not None:
+        if args.workers < 1:
+            parser.error("--workers must be at least 1")
+        if sorted(args.operations) != sorted(OPERATIONS):
+            parser.error("--workers runs both the insertion and the search simulations")
+        if args.repeats != 1 or args.sizes or args.block_size is not None or args.trials is not None:
+            parser.error("--workers can't be combined with --repeats, --sizes, --block-size or --trials")
+    if (args.cpu is not None or args.warmup is not None) and args.trials is None:
+        parser.error("--warmup and --cpu need --trials")
+    if args.warmup is None:
+        args.warmup = 5
+    return args
+
+def run(args):
+    """
+    Runs the simulations selected by the options, then plots them and fits their complexity.
+    The progress messages are written to stderr, so that stdout only receives the summary.
+
+    Parameters:
+    args (argparse.Namespace): The options returned by parse_args.
+
+    Returns:
+    dict: The machine-readable summary of the run.
+
+    Raises:
+    ValueError: If the dataset doesn't hold the distributions or sizes selected.
+    RuntimeError: If the process can't be pinned to a CPU on this platform.
+    """
+    if args.plot_dir:
+        import matplotlib
+        matplotlib.use("Agg")  # Headless: the figures are only saved to files
+
+    dataset = Helper.read_dataset(args.dataset)
+    missing = [distrib_key for distrib_key in args.distributions if distrib_key not in dataset]
+    if missing:
+        raise ValueError(f"the dataset has no {missing} distribution")
+    dataset = {distrib_key: dataset[distrib_key] for distrib_key in args.distributions}
+    size = min(len(keys) for keys in dataset.values())
+    sizes = sorted(set(args.sizes)) if args.sizes else None
+    if sizes and sizes[-1] > size:
+        raise ValueError(f"size {sizes[-1]} is larger than the dataset ({size} keys)")
+    if sizes:
+        size = sizes[-1]
+    dataset = {distrib_key: keys[:size] for distrib_key, keys in dataset.items()}
+
+    summary = {"dataset": args.dataset, "size": size, "structures": args.structures,
+               "distributions": args.distributions, "operations": args.operations, "repeats": args.repeats}
+    if args.compare:
+        summary["comparisons"] = {}
+    harness = Microbenchmark(warmup=args.warmup, trials=args.trials, cpu=args.cpu) if args.trials else None
+    b = Benchmark(dataset, structures=args.structures)
+    with redirect_stdout(sys.stderr):
+        if args.workers:
+            summary["insertion"], summary["search"] = simulate_parallel(b, args.workers, args.steps,
+                                                                        args.distributions[0], save=not args.no_save)
+        else:
+            if "insert" in args.operations:
+                summary["insertion"] = simulate_insertion(b, args.repeats, save=not args.no_save,
+                                                          block_size=args.block_size)
+            if "search" in args.operations:
+                summary["search"] = simulate_search(b, args.steps, sizes, args.distributions[0], args.repeats,
+                                                    save=not args.no_save, harness=harness)
+        for name in args.compare:
+            summary["comparisons"][name] = COMPARISONS[name](b, args.distributions[0])
+
+        if not args.no_plots and args.operations:
+            summary["fits"] = {}
+            if "insert" in args.operations:
+                summary["fits"]["insertion"] = b.plot_insert(plot_dir=args.plot_dir)
+            if "search" in args.operations:
+                summary["fits"]["search"] = b.plot_search(plot_dir=args.plot_dir)
+    return summary
+
+def main(argv=None):
     """
     Main function to load the dataset, initialize the benchmarking process, and run the simulations.
-    
-    - Loads the dataset from a JSON file.
-    - Runs both insertion and search simulations.
-    
+
+    - Loads the dataset from its binary files, memory-mapped.
+    - Runs the insertion and search simulations selected on the command line (both by default).
+    - Shows the plots, saves them to files, or skips them.
+    - Prints a JSON summary of the run on stdout.
+
+    Run `python main.py --help` for the options. For example, on a headless host:
+    python main.py --dataset data/dataset1M --structures AVL RB --sizes 100000 500000 1000000 --repeats 3 --plot-dir plots
+
+    Parameters:
+    argv (list of str): The command-line options, None to read them from the command line.
+
     Returns:
     None
     """
-    # Read the dataset from a JSON file (can be modified to use a different file)
-    # To run with 1M dataset use: data/dataset1M.json
-    dataset = Helper.read_json('data/dataset10.json')  # Change file name to test with another dataset
-    
-    # Initialize the Benchmark object with the loaded dataset
-    b = Benchmark(dataset)
-    
-    # Run the insertion simulation and plot the results
-    simulate_insertion(b)
-    
-    # Run the search simulation and plot the results (with 10 steps in this case)
-    simulate_search(b, 10)
-
-    # Uncomment below lines if you want to plot the results from pre-saved files
+    args = parse_args(argv)
+    try:
+        summary = run(args)
+    except (ValueError, RuntimeError) as error:
+        sys.exit(f"main.py: error: {error}")
+
+    output = json.dumps(summary, indent=2, default=float)  # NumPy scalars of the comparisons
+    print(output)
+    if args.summary:
+        with open(args.summary, "w") as file:
+            file.write(output)
+
+    # Saved results can be plotted again with (use the name of a results directory, or a JSON results file):
     # b.plot_search("search_results_1M_steps100.json")  # Sample plot search from file
     # b.plot_insert('insert_results_1M_cumulative.json')  # Sample plot insert from file
 
 if __name__ == '__main__':
     # Start the main program execution
-    main()
\ No newline at end of file
+    main()
@@ -4,19 +4,25 @@ class AVlNode:
     
     Each node contains a key, pointers to its left and right children, and a height value.
     The height is used to balance the tree and maintain the AVL property.
+    The attributes are declared in `__slots__` so that nodes don't carry a `__dict__`.
     """
 
-    def __init__(self, key):
+    __slots__ = ("key", "value", "left", "right", "height", "size")
+
+    def __init__(self, key, value=None):
         """
         Initializes a new node in the AVL Tree with the specified key.
         
         Parameters:
         key (int): The key to store in the node.
+        value: The payload associated with the key, None for trees used as sets.
         
         Sets the left and right pointers to None, and initializes the height to 1
         (since a newly created node has height 1, being a leaf node).
         """
         self.key = key  # The key for the node, used for binary search tree property.
+        self.value = value  # The payload of the node, only used when the tree is used as a map.
         self.left = None  # Pointer to the left child node (initially None).
         self.right = None  # Pointer to the right child node (initially None).
-        self.height = 1  # The height of the node, initialized to 1 (leaf node).
+        self.height = 1  # The height of the node, initialized to 1 (leaf node). Stays a small cached int.
+        self.size = 1  # Number of nodes in the subtree, only maintained by trees with order statistics.
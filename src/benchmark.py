@@ -1,103 +1,950 @@
 from src.treap import Treap
 from src.rb_tree import RBTree
 from src.avl_tree import AVLTree
+from src.array_avl_tree import ArrayAVLTree
+from src.concurrent_tree import ConcurrentTree
+from src.instrumentation import Instrumentation
+from src.priority import BatchedPriority, HashPriority, RandomPriority
+from src.sharded_forest import ShardedForest
 from .utils import Helper
 
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import gc
+import os
 import statistics
-import matplotlib.pyplot as plt
+import sys
+import threading
+import time
+import tracemalloc
 import numpy as np
 
 class Benchmark:
     """
     Benchmarking different search algorithms by varying search space size.
-    This class simulates insertion and search operations for different data structures (AVL, RB, and Treap).
+    This class simulates insertion and search operations for different data structures (AVL, RB, Treap and ArrayAVL).
     It collects execution times and plots the results for comparison.
     """
 
-    def __init__(self, dataset):
+    # Name of the node class of each node-based tree, in the module of the tree
+    NODE_CLASSES = {AVLTree: "AVlNode", RBTree: "RBNode", Treap: "TreapNode"}
+
+    def __init__(self, dataset, structures=None):
         """
         Initializes the Benchmark class with the dataset and prepares the necessary attributes.
 
         Parameters:
         dataset (dict): A dictionary containing the full dataset to be used in benchmarking.
-                        Format: {"random": [], "skewed": []}
+                        Format: {"random": [], "skewed": []}, lists or NumPy arrays, which
+                        can be memory-mapped (see `Helper.read_dataset`). A dataset can hold
+                        only one of the distributions.
+        structures (list of str): The names of the structures to benchmark, None for all of them.
 
-        n_steps (int): Number of data sizes to consider in the search simulation.
+        Raises:
+        ValueError: If a structure name is unknown.
         """
         self.dataset = dataset  # Dataset for benchmarking, containing random and skewed data distributions.
-        self.data_size = len(self.dataset['random'])  # Size of the dataset (for random data).
+        self.data_size = len(next(iter(self.dataset.values())))  # Size of the dataset (of its first distribution).
+
+        # Dictionary mapping the name of each benchmarked structure to its tree class.
+        self.structures = {
+            "AVL": AVLTree,
+            "RB": RBTree,
+            "Treap": Treap,
+            "ArrayAVL": ArrayAVLTree,
+        }
+        if structures is not None:
+            unknown = [struc_key for struc_key in structures if struc_key not in self.structures]
+            if unknown:
+                raise ValueError(f"unknown structures {unknown}, expected some of {list(self.structures)}")
+            self.structures = {struc_key: self.structures[struc_key] for struc_key in structures}
 
-        # Initialize dictionaries to store insertion results for AVL, RB, and Treap trees for both random and skewed distributions.
+        # Initialize dictionaries to store insertion results for every structure for every distribution (random and skewed).
+        # Every simulation stores its results in NumPy arrays of the right length.
         self.results_insertion = {
-            "random": { "AVL": [], "RB": [], "Treap": []},
-            "skewed": { "AVL": [], "RB": [], "Treap": []}
+            distrib_key: {struc_key: np.empty(0) for struc_key in self.structures} for distrib_key in self.dataset
         }
+        # Dataset size of each point of the insertion curves, None for one point per key (0, 1, 2, ...).
+        self.sizes_insertion = None
 
-        # Initialize a dictionary to store search results (time) for the three tree structures.
-        self.results_search = { "AVL": [], "RB": [], "Treap": []}
-        self.sizes_search = []  # To track dataset sizes for search simulations.
+        # Initialize a dictionary to store search results (time) for every structure.
+        self.results_search = {struc_key: np.empty(0) for struc_key in self.structures}
+        self.sizes_search = np.empty(0, dtype=np.int64)  # To track dataset sizes for search simulations.
+        # Spread of the search times, when they are measured with a Microbenchmark harness:
+        # { "AVL": {"q1": array, "q3": array, "ci_low": array, "ci_high": array}, ...}
+        self.stats_search = {}
+        self.results_bulk = {}  # Build times of the bulk build simulation.
+        self.results_deletion = {}  # Delete throughput of the deletion simulation.
 
         # Random values for search simulation across the search space.
         min_val = 1
         max_val = self.data_size * 100
-        self.random_values = np.random.choice(np.arange(min_val, max_val), size=50, replace=False)
+        # Drawn without materializing the range (the Generator samples a few values from a large range directly)
+        self.random_values = np.random.default_rng().choice(max_val - min_val, size=50, replace=False) + min_val
 
         # Dictionary mapping tree structures to specific colors for plotting.
         self.colour_key = {
             'AVL': 'cornflowerblue',
             'RB': 'red',
             'Treap': 'green',
+            'ArrayAVL': 'purple',
         }
 
-    def simulate_insertion(self):
+    def simulate_insertion(self, save=True, block_size=None):
         """
         Run the insertion simulation for all dataset distributions across all tree structures.
 
-        This function inserts the data points into AVL, RB, and Treap trees for both random and skewed datasets,
+        This function inserts the data points into every tree structure (AVL, RB, Treap, ArrayAVL) for both random and skewed datasets,
         tracks the cumulative insertion time for each structure, and saves the results.
+
+        Timing every insertion costs a clock read pair per key, which is about as slow as the insertion itself
+        for small trees. With a block size, every block of keys is timed as a whole (see `insert_blocks`): the
+        curves then hold the cumulative time after each block, and `sizes_insertion` the index of the last key
+        of each block, so they line up with the per-key curves.
+
+        Parameters:
+        save (bool): Whether to save the results in the results folder.
+        block_size (int): The number of insertions timed together, None to time every insertion.
         """
+        if block_size is not None and block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        if block_size:
+            self.sizes_insertion = np.minimum(np.arange(block_size, self.data_size + block_size, block_size),
+                                              self.data_size) - 1
+        else:
+            self.sizes_insertion = None
+
         print("Running Insert Simulation...")
         for distrib_key, data in self.dataset.items():
             print(distrib_key)
             # Initialize tree structures.
-            structures = {"AVL": AVLTree(), "RB": RBTree(), "Treap": Treap()}
+            structures = {struc_key: tree_class() for struc_key, tree_class in self.structures.items()}
             for struc_key, tree in structures.items():
-                cumulative = 0
-                for i in range(len(data)):
-                    _, exec_time = tree.insert_node(data[i])  # Insert node and get execution time.
-                    cumulative += exec_time  # Accumulate the execution time for the current insertion.
-                    self.results_insertion[distrib_key][struc_key].append(cumulative)
-                    if i % 10000 == 0:  # Print progress every 10,000 insertions.
-                        print(i)
+                if block_size:
+                    self.results_insertion[distrib_key][struc_key] = np.cumsum(self.insert_blocks(tree, data, block_size))
+                    continue
+                # Record the execution time of every insertion
+                instrumentation = tree.enable_instrumentation(Instrumentation(capacity=len(data)))
+                i = 0
+                for chunk in Helper.iter_chunks(data):  # Streams memory-mapped datasets
+                    for key in chunk:
+                        tree.insert_node(key)
+                        if i % 10000 == 0:  # Print progress every 10,000 insertions.
+                            print(i)
+                        i += 1
+                tree.disable_instrumentation()
+                # Accumulate the execution times of the insertions
+                self.results_insertion[distrib_key][struc_key] = np.cumsum(instrumentation.timings("insert_node"))
 
-        Helper.save_insert_results(self.results_insertion)  # Save the insertion results.
+        if save:
+            Helper.save_insert_results(self.results_insertion, self.sizes_insertion)  # Save the insertion results.
 
-    def simulate_search(self, n_steps=10):
+    @staticmethod
+    def insert_blocks(tree, data, block_size):
+        """
+        Inserts the keys into a tree, timing every block of block_size insertions with a single clock read pair.
+        The keys of a block are converted to Python ints before its timing starts.
+
+        Parameters:
+        tree: The tree structure to insert into.
+        data (list or numpy.ndarray): The keys to insert.
+        block_size (int): The number of insertions per block.
+
+        Returns:
+        numpy.ndarray: The execution time of every block, the last one possibly shorter.
+        """
+        timings = np.empty(-(-len(data) // block_size))
+        insert = tree.insert_node
+        next_report = 0
+        for i, block in enumerate(Helper.iter_chunks(data, block_size)):
+            start = time.perf_counter()
+            for key in block:
+                insert(key)
+            timings[i] = time.perf_counter() - start
+            if (i + 1) * block_size > next_report:  # Print progress about every 10,000 insertions.
+                print(i * block_size)
+                next_report += 10000
+        return timings
+
+    def simulate_search(self, n_steps=10, sizes=None, distrib_key='random', save=True, harness=None):
         """
         Executes the benchmark by testing the BST search over each data structure using increasing dataset sizes 
-        (only using the random uniformly distributed dataset).
+        (by default only using the random uniformly distributed dataset).
 
         Parameters:
         n_steps (int): The number of steps to increase the dataset size. The search is performed on each subset
                        of the dataset by dividing it into n_steps.
+        sizes (list of int): The dataset sizes to search, in ascending order, instead of n_steps equal steps.
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+        save (bool): Whether to save the results in the results folder.
+        harness (Microbenchmark): Optional harness timing the searches with warmup and repeated trials.
+                                  The results are then the median time per search, and `stats_search`
+                                  holds its interquartile range and confidence interval.
 
         Returns:
         dict: A dictionary containing the average execution times for each algorithm across different dataset sizes.
         """
         print("Running search simulation...")
-        step_size = self.data_size // n_steps  # Determine the step size for splitting the dataset.
-        structures = {"AVL": AVLTree(), "RB": RBTree(), "Treap": Treap()}  # Initialize tree structures.
+        if sizes is None:
+            step_size = self.data_size // n_steps  # Determine the step size for splitting the dataset.
+            sizes = np.arange(1, n_steps + 1) * step_size  # The size of the dataset at each step.
+        structures = {struc_key: tree_class() for struc_key, tree_class in self.structures.items()}  # Initialize tree structures.
+        self.sizes_search = np.asarray(sizes, dtype=np.int64)
+        self.results_search = {struc_key: np.empty(len(sizes)) for struc_key in self.structures}
+        self.stats_search = {struc_key: {stat: np.empty(len(sizes)) for stat in ("q1", "q3", "ci_low", "ci_high")}
+                             for struc_key in self.structures} if harness else {}
 
-        for i in range(n_steps):
-            length = (i + 1) * step_size  # Increase dataset size at each step.
-            self.sizes_search.append(length)  # Track the size of the dataset at each step.
-            new_keys = self.dataset['random'][length - step_size:length]  # Select a subset of the dataset for this step.
+        previous = 0
+        for i, length in enumerate(self.sizes_search.tolist()):  # Increase dataset size at each step.
+            new_keys = self.dataset[distrib_key][previous:length]  # Select a subset of the dataset for this step.
+            previous = length
             print(length)
             for struc_name, tree in structures.items():
                 self.insert_multiple_nodes(tree, new_keys)  # Insert nodes for the current tree.
-                self.results_search[struc_name].append(self.average_search(tree))  # Record average search time for this tree.
+                if harness is None:
+                    self.results_search[struc_name][i] = self.average_search(tree)  # Record average search time for this tree.
+                else:
+                    stats = self.search_statistics(tree, harness)
+                    self.results_search[struc_name][i] = stats["median"]
+                    for stat, values in self.stats_search[struc_name].items():
+                        values[i] = stats[stat]
+
+        if save:
+            Helper.save_search_results(self.results_search, self.sizes_search, self.stats_search)  # Save search results.
+
+    @staticmethod
+    def insertion_cell(tree_class, data):
+        """
+        Worker of the parallel runner: inserts the keys one by one into a new tree and times every insertion.
+
+        Parameters:
+        tree_class (type): The class of the tree to build.
+        data (list of int): The keys to insert.
+
+        Returns:
+        numpy.ndarray: The cumulative insertion time after each key, as in `results_insertion`.
+        """
+        tree = tree_class()
+        instrumentation = tree.enable_instrumentation(Instrumentation(capacity=len(data)))
+        for key in data:
+            tree.insert_node(key)
+        tree.disable_instrumentation()
+        return np.cumsum(instrumentation.timings("insert_node"))
+
+    @staticmethod
+    def search_cell(tree_class, data, queries):
+        """
+        Worker of the parallel runner: builds a tree with the given keys and times the search of the queries.
+
+        Parameters:
+        tree_class (type): The class of the tree to build.
+        data (list of int): The keys to insert, one by one as in `simulate_search`.
+        queries (list of int): The values to search for.
+
+        Returns:
+        float: The average execution time of the searches.
+        """
+        tree = tree_class()
+        for key in data:
+            tree.insert_node(key)
+        return Benchmark.mean_search_time(tree, queries)
+
+    def simulate_parallel(self, n_steps=10, max_workers=None, distrib_key='random', save=True):
+        """
+        Runs the insertion and search simulations with a pool of worker processes. Every cell of the
+        simulations is an independent task: one per (distribution, structure) for the insertion, one
+        per (structure, size) for the search. The search cells build their tree from scratch instead of
+        growing a shared one, so they can run in any order.
+
+        The search trees are built by inserting their keys one by one, as in `simulate_search`, so that
+        the searches run on trees of the same shape. The setup is then O(n_steps * n) insertions per
+        structure instead of O(n): with 10 steps, 5.5 times the insertions of `simulate_search`, spread
+        over the workers.
+
+        The results are merged into `results_insertion`, `results_search` and `sizes_search`, in the same
+        format as `simulate_insertion` and `simulate_search`.
+
+        Parameters:
+        n_steps (int): The number of dataset sizes of the search simulation.
+        max_workers (int): The maximum number of worker processes, None for the number of CPUs.
+        distrib_key (str): The dataset distribution of the search simulation ('random' or 'skewed').
+        save (bool): Whether to save the results in the results folder.
+
+        Return:
+        None
+        """
+        data = self.dataset[distrib_key]
+        step_size = len(data) // n_steps
+        sizes = [(i + 1) * step_size for i in range(n_steps)]
+        queries = self.random_values.tolist()
+        n_cells = len(self.dataset) * len(self.structures) + n_steps * len(self.structures)
+        workers = min(max_workers or os.cpu_count() or 1, n_cells)
+        print(f"Running parallel simulation: {n_cells} cells on {workers} workers...")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            insertion = {
+                (insert_key, struc_key): executor.submit(Benchmark.insertion_cell, tree_class, Helper.as_keys(keys))
+                for insert_key, keys in self.dataset.items()
+                for struc_key, tree_class in self.structures.items()
+            }
+            search = {
+                (struc_key, length): executor.submit(Benchmark.search_cell, tree_class,
+                                                     Helper.as_keys(data[:length]), queries)
+                for struc_key, tree_class in self.structures.items()
+                for length in sizes
+            }
+
+            self.sizes_insertion = None
+            for (insert_key, struc_key), future in insertion.items():
+                self.results_insertion[insert_key][struc_key] = future.result()
+            self.sizes_search = np.asarray(sizes)
+            self.stats_search = {}
+            for struc_key in self.structures:
+                self.results_search[struc_key] = np.array([search[struc_key, length].result() for length in sizes])
+
+        if save:
+            Helper.save_insert_results(self.results_insertion)
+            Helper.save_search_results(self.results_search, self.sizes_search)
+
+    def simulate_deletion(self):
+        """
+        Measures the delete throughput of the structures that support `delete_node`, for both
+        the random and skewed datasets. Each tree is built by inserting the whole dataset and
+        then emptied by deleting its keys in a random order.
+
+        Returns:
+        dict: The throughput in deletions per second in the format:
+        { "random": { "AVL": float, ...}, "skewed": {...}}
+        """
+        print("Running deletion simulation...")
+        results = {}
+        for distrib_key, data in self.dataset.items():
+            results[distrib_key] = {}
+            order = np.random.permutation(data).tolist()
+            for struc_key, tree_class in self.structures.items():
+                if not hasattr(tree_class, "delete_node"):
+                    continue
+                tree = tree_class()
+                self.insert_multiple_nodes(tree, data)
+
+                start = time.perf_counter()
+                for key in order:
+                    tree.delete_node(key)
+                results[distrib_key][struc_key] = len(order) / (time.perf_counter() - start)
+                print(f"{distrib_key} {struc_key}: {results[distrib_key][struc_key]:,.0f} deletions/s")
+
+        self.results_deletion = results
+        return results
+
+    def simulate_batch_insertion(self, batch_size=10000):
+        """
+        Compares the insertion throughput of `insert_many`, fed with batches of the dataset,
+        against inserting the same keys one at a time with `insert_node`, for both distributions.
+
+        Parameters:
+        batch_size (int): The number of keys per batch.
+
+        Returns:
+        dict: The throughput in keys per second in the format:
+        { "random": { "AVL": {"per_key": float, "batched": float}, ...}, "skewed": {...}}
+        """
+        print("Running batch insertion simulation...")
+        results = {}
+        for distrib_key, data in self.dataset.items():
+            results[distrib_key] = {}
+            for struc_key, tree_class in self.structures.items():
+                start = time.perf_counter()
+                self.insert_multiple_nodes(tree_class(), data)
+                per_key = len(data) / (time.perf_counter() - start)
+
+                tree = tree_class()
+                start = time.perf_counter()
+                for i in range(0, len(data), batch_size):
+                    tree.insert_many(data[i:i + batch_size])
+                batched = len(data) / (time.perf_counter() - start)
+
+                results[distrib_key][struc_key] = {"per_key": per_key, "batched": batched}
+                print(f"{distrib_key} {struc_key}: per key = {per_key:,.0f} keys/s, "
+                      f"batched = {batched:,.0f} keys/s ({batched / per_key:.1f}x)")
+
+        return results
+
+    def simulate_batch_merge(self, distrib_key='random', tree_size=None, batch_sizes=None):
+        """
+        Compares inserting a batch into a non-empty tree with `insert_many` against inserting its keys
+        one at a time with `insert_node`. Each tree is first built with `bulk_load` from the start of the
+        dataset, then the batch is made of the keys that follow.
+
+        Measured on CPython 3.11 with random keys and a tree of 100,000 keys, `insert_many` rebuilds the
+        tree for a batch of 100,000 keys 2.1-2.9x faster (1.5-1.7x for the Red-Black Tree) and for 50,000
+        keys 1.5-2.3x faster; batches of 10,000 keys, inserted one at a time in sorted order, gain 1.0-1.1x.
+
+        Parameters:
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+        tree_size (int): The number of keys in the tree before the batch, half the dataset by default.
+        batch_sizes (list of int): The sizes of the batches, by default a tenth, half and all of
+                                   tree_size (as far as the dataset allows).
+
+        Returns:
+        dict: The throughput in keys per second, and the strategy of insert_many, in the format:
+        { "AVL": {10000: {"per_key": float, "batched": float, "strategy": str}, ...}, ...}
+        """
+        keys = Helper.as_keys(self.dataset[distrib_key])
+        tree_size = len(keys) // 2 if tree_size is None else tree_size
+        if batch_sizes is None:
+            batch_sizes = sorted({max(1, tree_size // 10), max(1, tree_size // 2), tree_size})
+        batch_sizes = [size for size in batch_sizes if tree_size + size <= len(keys)]
+        print("Running batch merge simulation...")
+        results = {}
+
+        def timed(function):
+            # The collector would traverse the whole tree when the new nodes trigger it
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                value = function()
+                return time.perf_counter() - start, value
+            finally:
+                gc.enable()
+
+        def insert_all(tree, batch):
+            for key in batch:
+                tree.insert_node(key)
+
+        for struc_key, tree_class in self.structures.items():
+            results[struc_key] = {}
+            for batch_size in batch_sizes:
+                batch = keys[tree_size:tree_size + batch_size]
+
+                tree = tree_class.bulk_load(keys[:tree_size])
+                elapsed, _ = timed(lambda: insert_all(tree, batch))
+                per_key = batch_size / elapsed
+
+                tree = tree_class.bulk_load(keys[:tree_size])
+                elapsed, stats = timed(lambda: tree.insert_many(batch))
+                batched = batch_size / elapsed
+
+                results[struc_key][batch_size] = {"per_key": per_key, "batched": batched, "strategy": stats["strategy"]}
+                print(f"{struc_key} {batch_size} keys into {tree_size}: per key = {per_key:,.0f} keys/s, "
+                      f"batched = {batched:,.0f} keys/s ({batched / per_key:.1f}x, {stats['strategy']})")
+
+        return results
+
+    def simulate_batch_search(self, queries=None):
+        """
+        Compares the lookup throughput of `search_many`, which shares the descents of the search values
+        where they are dense relative to the tree, against calling `search_key` once per value, on trees
+        holding each distribution. The 50 random search values are too few to share descents, so both
+        search them one at a time; pass a larger batch as queries to see the shared traversal.
+
+        Parameters:
+        queries (numpy.ndarray): The values to search for, the random search values by default.
+
+        Returns:
+        dict: The throughput in keys per second in the format:
+        { "random": { "AVL": {"per_key": float, "batched": float}, ...}, "skewed": {...}}
+        """
+        queries = self.random_values if queries is None else queries
+        print("Running batch search simulation...")
+        results = {}
+        for distrib_key, data in self.dataset.items():
+            results[distrib_key] = {}
+            for struc_key, tree_class in self.structures.items():
+                tree = tree_class.bulk_load(data)
+
+                start = time.perf_counter()
+                for val in queries:
+                    tree.search_key(val)
+                per_key = len(queries) / (time.perf_counter() - start)
+
+                start = time.perf_counter()
+                tree.search_many(queries)
+                batched = len(queries) / (time.perf_counter() - start)
+
+                results[distrib_key][struc_key] = {"per_key": per_key, "batched": batched}
+                print(f"{distrib_key} {struc_key}: per key = {per_key:,.0f} keys/s, "
+                      f"batched = {batched:,.0f} keys/s ({batched / per_key:.1f}x)")
+
+        return results
+
+    def simulate_bulk_build(self):
+        """
+        Compares building each tree structure with `bulk_load` against inserting its keys one at a time,
+        for both the random and skewed datasets.
+
+        Returns:
+        dict: The build times in seconds in the format:
+        { "random": { "AVL": {"incremental": float, "bulk": float}, ...}, "skewed": {...}}
+        """
+        print("Running bulk build simulation...")
+        results = {}
+        for distrib_key, data in self.dataset.items():
+            results[distrib_key] = {}
+            for struc_key, tree_class in self.structures.items():
+                start = time.perf_counter()
+                self.insert_multiple_nodes(tree_class(), data)
+                incremental = time.perf_counter() - start
+
+                start = time.perf_counter()
+                tree_class.bulk_load(data)
+                bulk = time.perf_counter() - start
+
+                results[distrib_key][struc_key] = {"incremental": incremental, "bulk": bulk}
+                print(f"{distrib_key} {struc_key}: incremental = {incremental:.4f}s, bulk = {bulk:.4f}s")
+
+        self.results_bulk = results
+        return results
+
+    def compare_order_statistics(self, distrib_key='random'):
+        """
+        Compares the O(log n) order statistics queries (rank, select, count_range, median) of the trees
+        built with order statistics against answering the same queries with a linear inorder scan.
+
+        The random search values of the benchmark are used as query keys, and their ranks as positions for select.
+
+        Parameters:
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+
+        Returns:
+        dict: The average time per query in seconds in the format:
+        { "AVL": {"rank": {"indexed": float, "scan": float}, "select": {...}, ...}, "RB": {...}, "Treap": {...}}
+        Only the structures selected in the benchmark are compared.
+        """
+        keys = self.dataset[distrib_key]
+        queries = [int(value) for value in self.random_values]
+        positions = [index * len(keys) // len(queries) for index in range(len(queries))]
+        results = {}
+
+        def scan_select(tree, k):
+            for index, key in enumerate(tree):
+                if index == k:
+                    return key
+
+        # The array-backed AVL tree has no order statistics
+        for struc_key in [struc_key for struc_key in ("AVL", "RB", "Treap") if struc_key in self.structures]:
+            tree = self.structures[struc_key].bulk_load(keys, order_stats=True)
+            size = tree.subtree_size(tree.root)
+            operations = {
+                "rank": (queries, tree.rank,
+                         lambda q: sum(1 for key in tree if key < q)),
+                "select": (positions, tree.select,
+                           lambda k: scan_select(tree, k)),
+                "count_range": (queries, lambda q: tree.count_range(q, 2 * q),
+                                lambda q: sum(1 for key in tree if q <= key <= 2 * q)),
+                "median": ([None], lambda _: tree.median(),
+                           lambda _: scan_select(tree, (size - 1) // 2)),
+            }
+            results[struc_key] = {}
+            for operation, (arguments, indexed, linear) in operations.items():
+                timings = {}
+                for method, function in (("indexed", indexed), ("scan", linear)):
+                    start = time.perf_counter()
+                    for argument in arguments:
+                        function(argument)
+                    timings[method] = (time.perf_counter() - start) / len(arguments)
+                results[struc_key][operation] = timings
+                print(f"{struc_key} {operation}: indexed = {timings['indexed']:.2e}s, scan = {timings['scan']:.2e}s")
+
+        return results
+
+    def compare_engines(self, distrib_key='random'):
+        """
+        Compares the throughput of the iterative insert, search and delete paths against
+        the recursive reference implementations they replaced.
+
+        Each structure is built twice from the same keys, once with `insert` and once with
+        `insert_recursive`. Both trees are then searched for every key and, when the structure
+        keeps a recursive delete (not the Red-Black Tree), emptied again with `delete`/`delete_recursive`.
+        Both engines finish the root after every insertion in the same way (see `RBTree.finish_root`),
+        so the recursive engine also builds a valid tree.
+
+        Parameters:
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+
+        Returns:
+        dict: The operations per second for each structure, operation and engine in the format:
+        { "AVL": {"insert": {"recursive": float, "iterative": float}, "search": {...}}, ...}
+        A value of None means the recursive engine exceeded Python's recursion limit.
+        """
+        keys = Helper.as_keys(self.dataset[distrib_key])
+        # Only the structures that keep a recursive reference implementation
+        structures = {struc_key: tree_class for struc_key, tree_class in self.structures.items()
+                      if hasattr(tree_class, "insert_recursive")}
+        results = {}
+
+        def ops_per_sec(operation):
+            start = time.perf_counter()
+            try:
+                operation()
+            except RecursionError:
+                return None
+            return len(keys) / (time.perf_counter() - start)
 
-        Helper.save_search_results(self.results_search, self.sizes_search)  # Save search results.
+        for struc_key, tree_class in structures.items():
+            results[struc_key] = {}
+            engines = {
+                "recursive": (tree_class(), "insert_recursive", "search_recursive", "delete_recursive"),
+                "iterative": (tree_class(), "insert", "search", "delete"),
+            }
+            for engine, (tree, insert_name, search_name, delete_name) in engines.items():
+                insert, search = getattr(tree, insert_name), getattr(tree, search_name)
+                finish_root = getattr(tree, "finish_root", None)
+
+                def insert_all():
+                    for key in keys:
+                        tree.root = insert(tree.root, key)
+                        if finish_root is not None:
+                            tree.root = finish_root(tree.root)
+
+                def search_all():
+                    for key in keys:
+                        search(tree.root, key)
+
+                results[struc_key].setdefault("insert", {})[engine] = ops_per_sec(insert_all)
+                results[struc_key].setdefault("search", {})[engine] = ops_per_sec(search_all)
+
+                if hasattr(tree_class, "delete_recursive"):  # Only compared when both engines can delete
+                    delete = getattr(tree, delete_name)
+
+                    def delete_all():
+                        for key in keys:
+                            tree.root = delete(tree.root, key)
+
+                    results[struc_key].setdefault("delete", {})[engine] = ops_per_sec(delete_all)
+
+            for operation, engines_ops in results[struc_key].items():
+                print(f"{struc_key} {operation}: " + ", ".join(
+                    f"{engine} = {ops:,.0f} ops/s" if ops else f"{engine} = recursion limit exceeded"
+                    for engine, ops in engines_ops.items()))
+
+        return results
+
+    def compare_priority_sources(self, distrib_key='random'):
+        """
+        Compares the priority sources of the Treap: a narrow random range close to the original
+        0-99 priorities, wide 64-bit random integers, batched PRNG draws and hashes of the keys.
+
+        For each source a Treap is built by inserting the keys one at a time, then its depth is
+        measured and every key is searched for, to see the effect of the depth on search latency.
+
+        Parameters:
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+
+        Returns:
+        dict: The results for each source in the format:
+        { "narrow": {"insert": float (ops/s), "search": float (ops/s), "max_depth": int, "average_depth": float}, ...}
+        """
+        keys = Helper.as_keys(self.dataset[distrib_key])
+        sources = {
+            "narrow": RandomPriority(bits=7),
+            "random": RandomPriority(),
+            "batched": BatchedPriority(),
+            "hash": HashPriority(),
+        }
+        results = {}
+
+        for source_key, source in sources.items():
+            tree = Treap(priority_source=source)
+            start = time.perf_counter()
+            self.insert_multiple_nodes(tree, keys)
+            insert_ops = len(keys) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for key in keys:
+                tree.search_key(key)
+            search_ops = len(keys) / (time.perf_counter() - start)
+
+            report = tree.depth_report()
+            results[source_key] = {"insert": insert_ops, "search": search_ops,
+                                   "max_depth": report["max_depth"], "average_depth": report["average_depth"]}
+            print(f"{source_key}: insert = {insert_ops:,.0f} ops/s, search = {search_ops:,.0f} ops/s, "
+                  f"max depth = {report['max_depth']}, average depth = {report['average_depth']:.1f}")
+
+        return results
+
+    def measure_snapshots(self, distrib_key='random', n_updates=1000):
+        """
+        Measures the cost of a consistent view of the persistent trees (AVL and Treap): taking
+        a `snapshot` against deep-copying the tree, and the memory added by the writes made while
+        the snapshot is alive, against the same writes on a tree that isn't persistent.
+
+        Parameters:
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+        n_updates (int): The number of keys inserted after the snapshot.
+
+        Returns:
+        dict: The results for each structure in the format:
+        { "AVL": {"snapshot": float (s), "deepcopy": float (s),
+                  "persistent_bytes_per_update": float, "ephemeral_bytes_per_update": float}, ...}
+        """
+        keys = Helper.as_keys(self.dataset[distrib_key])
+        # Random keys that are not in the tree yet, so the updates touch paths all over the tree
+        present = set(keys)
+        updates = [key for key in np.random.randint(1, 2 * max(keys), size=2 * n_updates).tolist()
+                   if key not in present]
+        updates = list(dict.fromkeys(updates))[:n_updates]
+        structures = {"AVL": AVLTree, "Treap": Treap}
+        results = {}
+
+        for struc_key, tree_class in structures.items():
+            results[struc_key] = {}
+            for mode in ("ephemeral", "persistent"):
+                tree = tree_class.bulk_load(keys, persistent=mode == "persistent")
+                if mode == "persistent":
+                    start = time.perf_counter()
+                    snapshot = tree.snapshot()
+                    results[struc_key]["snapshot"] = time.perf_counter() - start
+                    start = time.perf_counter()
+                    copy.deepcopy(tree)
+                    results[struc_key]["deepcopy"] = time.perf_counter() - start
+
+                tracemalloc.start()
+                self.insert_multiple_nodes(tree, updates)
+                allocated, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results[struc_key][f"{mode}_bytes_per_update"] = allocated / len(updates)
+
+            del snapshot
+            print(f"{struc_key}: snapshot = {results[struc_key]['snapshot']:.2e}s, "
+                  f"deepcopy = {results[struc_key]['deepcopy']:.2e}s, bytes per update: "
+                  f"persistent = {results[struc_key]['persistent_bytes_per_update']:.0f}, "
+                  f"ephemeral = {results[struc_key]['ephemeral_bytes_per_update']:.0f}")
+
+        return results
+
+    def simulate_concurrent_reads(self, n_readers=4, distrib_key='random'):
+        """
+        Measures the read throughput of `ConcurrentTree` while a writer is active. Each tree holds
+        the first half of the dataset; a writer thread inserts the second half while the reader threads
+        search for random keys of the dataset, until the writer is done.
+
+        The readers-writer lock is used for every structure (AVL, RB, Treap, ArrayAVL), and copy-on-write
+        root swapping for the persistent AVL and Treap ("AVL (COW)", "Treap (COW)").
+
+        Parameters:
+        n_readers (int): The number of reader threads.
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+
+        Returns:
+        dict: The throughput in operations per second in the format:
+        { "AVL": {"reads": float, "writes": float}, ..., "AVL (COW)": {...}, "Treap (COW)": {...}}
+        """
+        keys = Helper.as_keys(self.dataset[distrib_key])
+        half = len(keys) // 2
+        trees = {struc_key: lambda tree_class=tree_class: tree_class.bulk_load(keys[:half])
+                 for struc_key, tree_class in self.structures.items()}
+        trees["AVL (COW)"] = lambda: AVLTree.bulk_load(keys[:half], persistent=True)
+        trees["Treap (COW)"] = lambda: Treap.bulk_load(keys[:half], persistent=True)
+        results = {}
+
+        for struc_key, build in trees.items():
+            tree = ConcurrentTree(build())
+            done = threading.Event()
+            reads = [0] * n_readers
+
+            def writer():
+                for key in keys[half:]:
+                    tree.insert_node(key)
+                done.set()
+
+            def reader(index):
+                queries = np.random.choice(keys, size=1000).tolist()
+                count = 0
+                while not done.is_set():
+                    for key in queries:
+                        tree.search_key(key)
+                    count += len(queries)
+                reads[index] = count
+
+            threads = [threading.Thread(target=reader, args=(i,)) for i in range(n_readers)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            writer()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            results[struc_key] = {"reads": sum(reads) / elapsed, "writes": (len(keys) - half) / elapsed}
+            print(f"{struc_key}: reads = {results[struc_key]['reads']:,.0f} ops/s, "
+                  f"writes = {results[struc_key]['writes']:,.0f} ops/s")
+
+        return results
+
+    def measure_memory(self, distrib_key='random'):
+        """
+        Measures the memory taken by each tree structure, reported as bytes per key.
+
+        The keys come from the dataset and are already allocated, so the measure only
+        accounts for the memory added by the tree itself (nodes and their attributes).
+        The node-based structures are measured twice: with their slotted nodes, and with a copy of
+        their node class without `__slots__` (see `dict_node_class`), i.e. a `__dict__` per node
+        as before the slots.
+
+        Parameters:
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+
+        Returns:
+        dict: The bytes per key for each structure and node layout in the format:
+        { "AVL": {"slots": float, "dict": float}, ..., "ArrayAVL": {"slots": float}}
+        """
+        keys = Helper.as_keys(self.dataset[distrib_key])
+        results = {}
+
+        def bytes_per_key(tree_class):
+            tracemalloc.start()
+            tree = tree_class()
+            self.insert_multiple_nodes(tree, keys)
+            allocated, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return allocated / len(keys)
+
+        for struc_key, tree_class in self.structures.items():
+            results[struc_key] = {"slots": bytes_per_key(tree_class)}
+            node_name = self.NODE_CLASSES.get(tree_class)
+            if node_name is not None:
+                # The trees create their nodes through the name of the class in their module
+                module = sys.modules[tree_class.__module__]
+                slotted = getattr(module, node_name)
+                setattr(module, node_name, Benchmark.dict_node_class(slotted))
+                try:
+                    results[struc_key]["dict"] = bytes_per_key(tree_class)
+                finally:
+                    setattr(module, node_name, slotted)
+            print(f"{struc_key}: " + ", ".join(f"{layout} = {value:.1f}" for layout, value in results[struc_key].items())
+                  + " bytes per key")
+
+        return results
+
+    @staticmethod
+    def dict_node_class(node_class):
+        """
+        Copies a slotted node class without its `__slots__`, so that its instances keep their
+        attributes in a `__dict__`. The methods and properties are shared with the original class.
+
+        Parameters:
+        node_class (type): The node class, declaring `__slots__`.
+
+        Returns:
+        type: The node class with a `__dict__`.
+        """
+        excluded = {"__slots__", "__dict__", "__weakref__", *node_class.__slots__}
+        namespace = {name: value for name, value in vars(node_class).items() if name not in excluded}
+        return type(node_class.__name__, node_class.__bases__, namespace)
+
+    def compare_map_mode(self, distrib_key='random'):
+        """
+        Compares storing a payload with every key in the tree nodes (map mode) against
+        keeping the tree as a set of keys next to a dict from keys to payloads.
+
+        The memory is reported as bytes per key, and the latency as operations per second for
+        building the container and for looking up the payloads. A dict+tree lookup checks the
+        key in the tree before reading its payload from the dict.
+
+        Parameters:
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+
+        Returns:
+        dict: The results for each structure and layout in the format:
+        { "AVL": {"map": {"bytes_per_key": float, "build": float, "lookup": float}, "dict+tree": {...}}, ...}
+        """
+        keys = Helper.as_keys(self.dataset[distrib_key])
+        payloads = [(key,) for key in keys]  # Allocated beforehand, so only the containers are measured
+        # The array-backed AVL tree only stores keys
+        structures = {struc_key: tree_class for struc_key, tree_class in self.structures.items()
+                      if tree_class is not ArrayAVLTree}
+        results = {}
+
+        def build_map():
+            tree = tree_class()
+            for key, payload in zip(keys, payloads):
+                tree[key] = payload
+            return tree, None
+
+        def build_dict_tree():
+            tree, payload_of = tree_class(), {}
+            for key, payload in zip(keys, payloads):
+                tree.insert_node(key)
+                payload_of[key] = payload
+            return tree, payload_of
+
+        def lookup_map(tree, _):
+            for key in keys:
+                tree[key]
+
+        def lookup_dict_tree(tree, payload_of):
+            for key in keys:
+                if tree.search_key(key):
+                    payload_of[key]
+
+        for struc_key, tree_class in structures.items():
+            results[struc_key] = {}
+            for layout, build, lookup in (("map", build_map, lookup_map),
+                                          ("dict+tree", build_dict_tree, lookup_dict_tree)):
+                tracemalloc.start()
+                containers = build()
+                allocated, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                del containers
+
+                start = time.perf_counter()
+                containers = build()
+                build_ops = len(keys) / (time.perf_counter() - start)
+                start = time.perf_counter()
+                lookup(*containers)
+                lookup_ops = len(keys) / (time.perf_counter() - start)
+
+                results[struc_key][layout] = {"bytes_per_key": allocated / len(keys),
+                                              "build": build_ops, "lookup": lookup_ops}
+                print(f"{struc_key} {layout}: {allocated / len(keys):.1f} bytes per key, "
+                      f"build = {build_ops:,.0f} ops/s, lookup = {lookup_ops:,.0f} ops/s")
+
+        return results
+
+    def compare_sharding(self, distrib_key='skewed', n_shards=4, batch_size=100000):
+        """
+        Compares a single tree against a `ShardedForest` of the same trees spread over worker processes.
+        Both insert the dataset with `insert_many` in batches of batch_size keys, then search for the
+        whole dataset with `search_many`. The throughput of the forest includes sending the keys to the
+        workers and back.
+
+        Parameters:
+        distrib_key (str): The dataset distribution to use ('random' or 'skewed').
+        n_shards (int): The number of shards of the forest.
+        batch_size (int): The number of keys of each insertion batch.
+
+        Returns:
+        dict: The throughput in keys per second in the format:
+        { "AVL": {"single": {"insert": float, "search": float}, "sharded": {...}, "shard_sizes": list}, ...}
+        """
+        print("Running sharding comparison...")
+        keys = np.asarray(self.dataset[distrib_key])
+        batches = [keys[start:start + batch_size] for start in range(0, len(keys), batch_size)]
+        results = {}
+
+        def measure(index):
+            start = time.perf_counter()
+            for batch in batches:
+                index.insert_many(batch)
+            insert = len(keys) / (time.perf_counter() - start)
+            start = time.perf_counter()
+            index.search_many(keys)
+            return {"insert": insert, "search": len(keys) / (time.perf_counter() - start)}
+
+        for struc_key, tree_class in self.structures.items():
+            if tree_class is ArrayAVLTree:  # The shards need order statistics
+                continue
+            results[struc_key] = {"single": measure(tree_class())}
+            with ShardedForest(tree_class, n_shards=n_shards) as forest:
+                results[struc_key]["sharded"] = measure(forest)
+                results[struc_key]["shard_sizes"] = list(forest.counts)
+            single, sharded = results[struc_key]["single"], results[struc_key]["sharded"]
+            print(f"{struc_key}: single insert = {single['insert']:,.0f} keys/s, search = {single['search']:,.0f} keys/s; "
+                  f"sharded insert = {sharded['insert']:,.0f} keys/s, search = {sharded['search']:,.0f} keys/s, "
+                  f"shard sizes = {results[struc_key]['shard_sizes']}")
+
+        return results
 
     def insert_multiple_nodes(self, tree, keys):
         """
@@ -105,10 +952,11 @@ class Benchmark:
 
         Parameters:
         tree: The tree structure (AVL, RB, or Treap) where nodes will be inserted.
-        keys (list): A list of keys to insert into the tree.
+        keys (list or numpy.ndarray): The keys to insert into the tree, possibly memory-mapped.
         """
-        for key in keys:
-            tree.insert_node(key)  # Insert each key into the tree.
+        for chunk in Helper.iter_chunks(keys):
+            for key in chunk:
+                tree.insert_node(key)  # Insert each key into the tree.
 
     def average_search(self, tree):
         """
@@ -120,30 +968,83 @@ class Benchmark:
         Returns:
         float: The average execution time for searching for the random values in the tree.
         """
-        results = []
-        for val in self.random_values:
-            _, time_elapsed = tree.search_key(val)  # Perform search and get time.
-            results.append(time_elapsed)  # Store the time for each search.
-        return statistics.mean(results)  # Return the average of all search times.
+        return Benchmark.mean_search_time(tree, self.random_values)
+
+    def search_statistics(self, tree, harness):
+        """
+        Times the search for the random values in a tree with a microbenchmark harness.
+
+        Parameters:
+        tree: The tree structure to perform searches on.
+        harness (Microbenchmark): The harness running the warmup and the trials.
+
+        Returns:
+        dict: The statistics of the time per search (see `Microbenchmark.summarize`).
+        """
+        queries = Helper.as_keys(self.random_values)
+
+        def search_all():
+            for val in queries:
+                tree.search_key(val)
+
+        return harness.run(search_all, len(queries))
+
+    @staticmethod
+    def mean_search_time(tree, queries):
+        """
+        Calculates the average time taken to search for the given values in a tree.
+
+        Parameters:
+        tree: The tree structure to perform searches on.
+        queries (iterable of int): The values to search for.
+
+        Returns:
+        float: The average execution time of the searches.
+        """
+        # Record the execution time of every search
+        instrumentation = tree.enable_instrumentation(Instrumentation(capacity=len(queries)))
+        for val in queries:
+            tree.search_key(val)
+        tree.disable_instrumentation()
+        return statistics.mean(instrumentation.timings("search_key").tolist())  # Return the average of all search times.
 
-    def plot_insert(self, file=''):
+    def plot_insert(self, file='', max_points=None, plot_dir=None):
         """
         Plots the results of the insertion simulation.
 
         This function plots cumulative insertion times for each distribution (random and skewed) 
-        and each tree structure (AVL, RB, and Treap). It also allows plotting from a saved file.
+        and each tree structure (AVL, RB, Treap, ArrayAVL). It also allows plotting from a saved file.
 
         Parameters:
-        file (str): Optional file name to load saved insertion results.
+        file (str): Optional name of the saved insertion results to load: a results directory,
+                    or a JSON file saved before the columnar format.
+        max_points (int): Optional maximum number of points to plot per curve. Saved results are
+                          downsampled while being read, without loading the full curves.
+        plot_dir (str): Optional directory where the plots are saved as PNG files instead of being shown.
+
+        Returns:
+        dict: The n log n fits of the curves (see `Helper.check_nlogn_trend`).
         """
-        if file:
+        import matplotlib.pyplot as plt  # Imported here so that running the simulations doesn't load it
+
+        if file.endswith(".json"):
             self.results_insertion = Helper.read_results_file(file)  # Load results from file if provided.
+            self.sizes_insertion = None
+        elif file:
+            # Load the results from their columnar files, downsampled while being read.
+            self.results_insertion, dataset_sizes = Helper.read_insert_results(file, max_points)
 
-        # Define dataset sizes (x-axis) starting from 0.
-        dataset_sizes = np.arange(len(next(iter(self.results_insertion['random'].values()))))
+        results = self.results_insertion
+        if not file or file.endswith(".json"):
+            # Define dataset sizes (x-axis) starting from 0 (or the block ends), keeping one point every 'step'.
+            length = len(next(iter(next(iter(results.values())).values())))
+            step = -(-length // max_points) if max_points and length else 1
+            dataset_sizes = np.arange(0, length, step) if self.sizes_insertion is None else self.sizes_insertion[::step]
+            results = {dist_name: {structure: np.asarray(runtimes)[::step] for structure, runtimes in structures.items()}
+                       for dist_name, structures in results.items()}
 
         # Plot each distribution separately for all structures on the same plot.
-        for dist_name, structures in self.results_insertion.items():
+        for dist_name, structures in results.items():
             plt.figure(figsize=(8, 6))
             for structure, runtimes in structures.items():
                 plt.plot(dataset_sizes, runtimes, color=self.colour_key[structure], label=structure)
@@ -153,24 +1054,32 @@ class Benchmark:
             plt.title(f"Cumulative Insertion Time - {dist_name.capitalize()} Distribution")
             plt.legend()
             plt.grid()
-            plt.show()
+            Helper.finish_plot(f"insert_{dist_name}", plot_dir)
 
-        Helper.check_nlogn_trend(self.results_insertion)
+        return Helper.check_nlogn_trend(results, dataset_sizes, plot_dir)
 
-    def plot_search(self, file=''):
+    def plot_search(self, file='', plot_dir=None):
         """
         Plots the results of the search simulation.
 
-        This function plots the execution time for each search algorithm (AVL, RB, and Treap) over increasing dataset sizes.
+        This function plots the execution time for each search algorithm (AVL, RB, Treap, ArrayAVL) over increasing dataset sizes.
         It also allows plotting from a saved file.
 
         Parameters:
-        file (str): Optional file name to load saved search results.
+        file (str): Optional name of the saved search results to load: a results directory,
+                    or a JSON file saved before the columnar format.
+        plot_dir (str): Optional directory where the plots are saved as PNG files instead of being shown.
+
+        Returns:
+        dict: The logarithmic fits of the search times (see `Helper.check_log_trend`).
         """
+        import matplotlib.pyplot as plt
+
         if file:
-            results = Helper.read_results_file(file)
+            results = Helper.read_results_file(file) if file.endswith(".json") else Helper.read_search_results(file)
             self.sizes_search = results['Data_sizes']  # Load dataset sizes.
             self.results_search = results['Exec_times']  # Load execution times.
+            self.stats_search = results.get('Stats', {})  # Load the spread of the times, if measured.
 
         plt.figure()
         plt.ylabel('Run time (s)')
@@ -180,12 +1089,18 @@ class Benchmark:
         # Plot each algorithm's results.
         for tree, times in self.results_search.items():
             plt.plot(self.sizes_search, times, label=tree, color=self.colour_key[tree])
+            if tree in self.stats_search:
+                # Shade the confidence interval of the median
+                stats = self.stats_search[tree]
+                plt.fill_between(self.sizes_search, stats["ci_low"], stats["ci_high"], color=self.colour_key[tree], alpha=0.2)
 
         plt.legend()
-        plt.show()
+        Helper.finish_plot("search", plot_dir)
 
         results = {
             "Exec_times": self.results_search,
             "Data_sizes": self.sizes_search
         }
-        Helper.check_log_trend(results)
\ No newline at end of file
+        if self.stats_search:
+            results["Stats"] = self.stats_search
+        return Helper.check_log_trend(results, plot_dir)
\ No newline at end of file
@@ -0,0 +1,313 @@
+from contextlib import contextmanager
+import threading
+
+class ReadWriteLock:
+    """
+    A readers-writer lock: any number of readers can hold it together, while a writer holds it alone.
+    Waiting writers go first, so a steady flow of readers cannot starve the writer.
+    """
+
+    def __init__(self):
+        """
+        Initializes the lock, free.
+
+        Return:
+        None
+        """
+        self.condition = threading.Condition()
+        self.readers = 0  # Number of readers holding the lock.
+        self.writing = False  # Whether a writer holds the lock.
+        self.waiting_writers = 0  # Number of writers waiting for the lock.
+
+    def acquire_read(self):
+        """
+        Waits until no writer holds or waits for the lock, then takes a read hold.
+
+        Return:
+        None
+        """
+        with self.condition:
+            while self.writing or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+
+    def release_read(self):
+        """
+        Releases a read hold, waking up the writers when the last reader leaves.
+
+        Return:
+        None
+        """
+        with self.condition:
+            self.readers -= 1
+            if not self.readers:
+                self.condition.notify_all()
+
+    def acquire_write(self):
+        """
+        Waits until the readers and the writer holding the lock are done, then takes it alone.
+
+        Return:
+        None
+        """
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writing or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writing = True
+
+    def release_write(self):
+        """
+        Releases the write hold and wakes up the waiting readers and writers.
+
+        Return:
+        None
+        """
+        with self.condition:
+            self.writing = False
+            self.condition.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        """
+        Context manager holding the lock for reading.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        """
+        Context manager holding the lock for writing.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentTree:
+    """
+    Thread-safe wrapper around any BaseTree, for lookups served from many threads while others write.
+
+    Two strategies are used, depending on the tree:
+    - Persistent trees (built with persistent=True) use copy-on-write root swapping: the writers are
+      serialized by a mutex and publish a new `snapshot` after every write, in O(1). Readers never lock,
+      they read the latest published snapshot, which never changes under them.
+    - Other trees are guarded by a readers-writer lock, so reads run together and writes alone.
+
+    Lazy results (range scans, iteration, items) are returned as lists, read in a single consistent pass.
+    """
+
+    def __init__(self, tree):
+        """
+        Wraps the given tree. The tree must not be used directly anymore.
+
+        Parameters:
+        tree (BaseTree): The tree to protect.
+
+        Return:
+        None
+        """
+        self.tree = tree
+        self.copy_on_write = tree.persistent
+        self.lock = ReadWriteLock()  # Guards the tree when it isn't persistent
+        self.write_mutex = threading.Lock()  # Serializes the writers of a persistent tree
+        self.view = tree.snapshot() if self.copy_on_write else None  # The latest published snapshot
+
+    def read(self, function):
+        """
+        Runs a read-only function on a consistent state of the tree.
+
+        Parameters:
+        function (function): Takes the tree (or its latest snapshot) and returns the result.
+
+        Return:
+        The result of the function.
+        """
+        if self.copy_on_write:
+            return function(self.view)
+        with self.lock.read_locked():
+            return function(self.tree)
+
+    def write(self, function):
+        """
+        Runs a function modifying the tree, excluding the other writers (and readers, without copy-on-write).
+
+        Parameters:
+        function (function): Takes the tree, modifies it and returns the result.
+
+        Return:
+        The result of the function.
+        """
+        if self.copy_on_write:
+            with self.write_mutex:
+                result = function(self.tree)
+                self.view = self.tree.snapshot()  # Swapping the reference is atomic for the readers
+            return result
+        with self.lock.write_locked():
+            return function(self.tree)
+
+    def search_key(self, key):
+        """
+        Searches for the given key.
+
+        Parameters:
+        key (int): The key to search for.
+
+        Return:
+        bool: True if the key is found, False if not.
+        """
+        return self.read(lambda tree: tree.search_key(key))
+
+    def search_many(self, keys):
+        """
+        Searches for a batch of keys (see `BaseTree.search_many`).
+
+        Parameters:
+        keys (iterable of int): The keys to search for, a list or a NumPy array.
+
+        Return:
+        numpy.ndarray: A boolean array aligned with 'keys', True where the key is in the tree.
+        """
+        return self.read(lambda tree: tree.search_many(keys))
+
+    def get(self, key, default=None):
+        """
+        Gets the value stored with the given key (map mode), or a default value if it is missing.
+
+        Parameters:
+        key (int): The key to look up.
+        default: The value returned if the key isn't in the tree.
+
+        Return:
+        The value stored with the key, or default.
+        """
+        return self.read(lambda tree: tree.get(key, default))
+
+    def __getitem__(self, key):
+        """
+        Gets the value stored with the given key (map mode).
+
+        Parameters:
+        key (int): The key to look up.
+
+        Return:
+        The value stored with the key.
+
+        Raises:
+        KeyError: If the key isn't in the tree.
+        """
+        return self.read(lambda tree: tree[key])
+
+    def range(self, lo, hi):
+        """
+        Gets the keys between lo and hi (both included) in ascending order.
+
+        Parameters:
+        lo (int): The lower bound of the range.
+        hi (int): The upper bound of the range.
+
+        Return:
+        list of int: The keys k such that lo <= k <= hi, in ascending order.
+        """
+        return self.read(lambda tree: list(tree.range(lo, hi)))
+
+    def keys(self):
+        """
+        Gets all the keys in ascending order.
+
+        Return:
+        list of int: The keys of the tree.
+        """
+        return self.read(list)
+
+    def __iter__(self):
+        """
+        Iterates over the keys present when the iteration starts, in ascending order.
+
+        Return:
+        iterator: The keys in ascending order.
+        """
+        return iter(self.keys())
+
+    def items(self):
+        """
+        Gets the (key, value) pairs in ascending key order (map mode).
+
+        Return:
+        list of tuple: The (key, value) pairs.
+        """
+        return self.read(lambda tree: list(tree.items()))
+
+    def insert_node(self, key, value=None):
+        """
+        Inserts a key (and its value in map mode) into the tree.
+
+        Parameters:
+        key (int): The key to insert.
+        value: The payload stored with the key, None for a set.
+
+        Return:
+        None
+        """
+        if value is None:
+            return self.write(lambda tree: tree.insert_node(key))
+        return self.write(lambda tree: tree.insert_node(key, value))
+
+    def delete_node(self, key):
+        """
+        Deletes a key from the tree.
+
+        Parameters:
+        key (int): The key to delete.
+
+        Return:
+        None
+        """
+        return self.write(lambda tree: tree.delete_node(key))
+
+    def insert_many(self, keys):
+        """
+        Inserts a batch of keys in one write (see `BaseTree.insert_many`).
+
+        Parameters:
+        keys (iterable of int): The keys to insert, a list or a NumPy array.
+
+        Return:
+        dict: The aggregate stats returned by the tree.
+        """
+        return self.write(lambda tree: tree.insert_many(keys))
+
+    def __setitem__(self, key, value):
+        """
+        Stores a value with the given key (map mode).
+
+        Parameters:
+        key (int): The key to store.
+        value: The value to store with the key.
+
+        Return:
+        None
+        """
+        self.write(lambda tree: tree.__setitem__(key, value))
+
+    def __delitem__(self, key):
+        """
+        Deletes the given key and its value (map mode).
+
+        Parameters:
+        key (int): The key to delete.
+
+        Return:
+        None
+
+        Raises:
+        KeyError: If the key isn't in the tree.
+        """
+        self.write(lambda tree: tree.__delitem__(key))
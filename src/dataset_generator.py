@@ -0,0 +1,190 @@
+import math
+import os
+import numpy as np
+
+class DatasetGenerator:
+    """
+    Generates the random uniform and random skewed datasets in chunks, in O(chunk_size) memory,
+    so that datasets of hundreds of millions of keys can be written straight to disk.
+
+    The keys are distinct integers between 1 and 100 * size, as in `Helper.generate_datasets`.
+    The skewed keys follow the same exponential decay, exp(-skew_factor * (x - 1) / (max_val - 1)).
+
+    Instead of drawing from a probability vector over the whole key range, the range is cut into
+    blocks: the number of keys of every block is drawn from a multinomial distribution following the
+    probability mass of the block, then the keys of each block are drawn uniformly without replacement
+    (the density barely changes within a block). The keys are produced block after block, so every
+    key is placed at a pseudo-random position of the dataset given by a Feistel permutation of the
+    indexes, which shuffles the dataset without holding it in memory.
+    """
+
+    FEISTEL_ROUNDS = 4
+    MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+    def __init__(self, size, seed=None, chunk_size=1 << 20, skew_factor=2.0, n_blocks=4096):
+        """
+        Initializes the generator.
+
+        Parameters:
+        size (int): The number of keys of each distribution.
+        seed (int): The seed of the generator, None to seed it from the system.
+        chunk_size (int): The approximate number of keys generated at once.
+        skew_factor (float): The decay rate of the skewed distribution over the key range.
+        n_blocks (int): The minimum number of blocks the key range is cut into.
+
+        Return:
+        None
+        """
+        self.size = size
+        self.chunk_size = chunk_size
+        self.skew_factor = skew_factor
+        self.min_val = 1
+        self.max_val = size * 100
+        self.rng = np.random.default_rng(seed)
+        self.round_keys = self.rng.integers(0, 1 << 63, size=self.FEISTEL_ROUNDS, dtype=np.uint64)
+
+        # Enough blocks for every chunk to span a few of them, but never empty ones
+        n_blocks = min(max(n_blocks, 16 * math.ceil(size / chunk_size)), self.max_val - self.min_val)
+        self.edges = np.unique(np.linspace(self.min_val, self.max_val, n_blocks + 1).astype(np.int64))
+
+        # Feistel network on an even number of bits covering the indexes
+        self.half_bits = max(1, math.ceil(math.log2(max(size, 2)) / 2))
+        self.half_mask = np.uint64((1 << self.half_bits) - 1)
+
+    def block_masses(self, distrib_key):
+        """
+        Computes the probability mass of every block of the key range.
+
+        Parameters:
+        distrib_key (str): 'random' (uniform) or 'skewed' (exponential decay).
+
+        Return:
+        numpy.ndarray: The mass of each block, summing to 1.
+        """
+        if distrib_key == 'random':
+            masses = np.diff(self.edges).astype(float)
+        elif distrib_key == 'skewed':
+            # Integral of the exponential density over each block
+            scale = self.skew_factor / (self.max_val - self.min_val)
+            masses = -np.diff(np.exp(-scale * (self.edges - self.min_val)))
+        else:
+            raise ValueError(f"unknown distribution '{distrib_key}', expected 'random' or 'skewed'")
+        return masses / masses.sum()
+
+    def block_counts(self, distrib_key):
+        """
+        Draws the number of keys of every block, never more than the block holds.
+
+        Parameters:
+        distrib_key (str): 'random' or 'skewed'.
+
+        Return:
+        numpy.ndarray: The number of keys to draw in each block, summing to size.
+        """
+        masses = self.block_masses(distrib_key)
+        widths = np.diff(self.edges)
+        counts = self.rng.multinomial(self.size, masses)
+        # Full blocks give their excess keys to the blocks with room left
+        while (counts > widths).any():
+            excess = int(np.maximum(counts - widths, 0).sum())
+            counts = np.minimum(counts, widths)
+            room = np.where(counts < widths, masses, 0)
+            counts += self.rng.multinomial(excess, room / room.sum())
+        return counts
+
+    def chunks(self, distrib_key):
+        """
+        Lazily generates the keys of a distribution, a few blocks at a time, in ascending block order.
+
+        Parameters:
+        distrib_key (str): 'random' or 'skewed'.
+
+        Return:
+        generator: numpy.ndarray chunks of distinct int64 keys, about chunk_size keys each.
+        """
+        counts = self.block_counts(distrib_key)
+        pending, pending_size = [], 0
+        for block, count in enumerate(counts.tolist()):
+            if count:
+                width = int(self.edges[block + 1] - self.edges[block])
+                pending.append(self.edges[block] + self.rng.choice(width, size=count, replace=False))
+                pending_size += count
+            if pending_size >= self.chunk_size:
+                yield np.concatenate(pending)
+                pending, pending_size = [], 0
+        if pending:
+            yield np.concatenate(pending)
+
+    def permute(self, indexes):
+        """
+        Maps indexes to pseudo-random positions with a Feistel network: a bijection of [0, size),
+        computed without any table. Positions falling outside the range are permuted again
+        (cycle walking) until they fall inside it.
+
+        Parameters:
+        indexes (numpy.ndarray): Indexes between 0 and size - 1.
+
+        Return:
+        numpy.ndarray: The position of each index, between 0 and size - 1.
+        """
+        positions = indexes.astype(np.uint64)
+        outside = np.ones(len(positions), dtype=bool)
+        while outside.any():
+            left = positions[outside] >> np.uint64(self.half_bits)
+            right = positions[outside] & self.half_mask
+            for key in self.round_keys:
+                hashed = ((right ^ key) * self.MULTIPLIER) >> np.uint64(64 - self.half_bits)
+                left, right = right, left ^ hashed
+            positions[outside] = (left << np.uint64(self.half_bits)) | right
+            outside = positions >= self.size
+        return positions.astype(np.int64)
+
+    def fill(self, distrib_key, out):
+        """
+        Generates the keys of a distribution into an array, at their shuffled positions.
+
+        Parameters:
+        distrib_key (str): 'random' or 'skewed'.
+        out (numpy.ndarray): An int64 array of length size, possibly memory-mapped.
+
+        Return:
+        None
+        """
+        start = 0
+        for chunk in self.chunks(distrib_key):
+            out[self.permute(np.arange(start, start + len(chunk)))] = chunk
+            start += len(chunk)
+
+    def generate(self):
+        """
+        Generates the whole dataset in memory.
+
+        Return:
+        dict: The generated dataset in the format:
+        {'random': numpy.ndarray, 'skewed': numpy.ndarray}
+        """
+        dataset = {}
+        for distrib_key in ('random', 'skewed'):
+            dataset[distrib_key] = np.empty(self.size, dtype=np.int64)
+            self.fill(distrib_key, dataset[distrib_key])
+        return dataset
+
+    def write(self, path):
+        """
+        Generates the dataset straight into the binary format (see `Helper.save_dataset_binary`):
+        the .npy files are memory-mapped and filled chunk by chunk.
+
+        Parameters:
+        path (str): The directory to write, created if needed.
+
+        Return:
+        str: The directory of the dataset.
+        """
+        os.makedirs(path, exist_ok=True)
+        for distrib_key in ('random', 'skewed'):
+            out = np.lib.format.open_memmap(os.path.join(path, f"{distrib_key}.npy"), mode="w+",
+                                            dtype=np.int64, shape=(self.size,))
+            self.fill(distrib_key, out)
+            out.flush()
+            del out
+        return path
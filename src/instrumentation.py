@@ -0,0 +1,93 @@
+from array import array
+from time import perf_counter
+import numpy as np
+
+class Instrumentation:
+    """
+    Records the execution time of the tree operations (insert_node, delete_node, search_key).
+
+    The trees run their plain methods by default, without any timing cost. Instrumentation is switched on
+    explicitly, either for a single tree (`BaseTree.enable_instrumentation`) or for every tree of a class
+    (`BaseTree.enable_global_instrumentation`): the operations are then replaced by wrappers that time them
+    and append the elapsed seconds to a preallocated buffer per operation, returning the same result as the
+    plain methods. Switching it off removes the wrappers again.
+    """
+
+    OPERATIONS = ("insert_node", "delete_node", "search_key")  # The operations that can be timed.
+
+    def __init__(self, capacity=65536):
+        """
+        Initializes the timing buffers.
+
+        Parameters:
+        capacity (int): The number of timings each buffer can hold before growing.
+
+        Return:
+        None
+        """
+        capacity = max(capacity, 1)
+        self.buffers = {operation: array('d', bytes(8 * capacity)) for operation in self.OPERATIONS}
+        self.counts = {operation: 0 for operation in self.OPERATIONS}  # Number of timings recorded.
+
+    def record(self, operation, elapsed):
+        """
+        Appends a timing to the buffer of the given operation, doubling its capacity if it is full.
+
+        Parameters:
+        operation (str): The name of the timed operation.
+        elapsed (float): The execution time in seconds.
+
+        Return:
+        None
+        """
+        buffer = self.buffers[operation]
+        count = self.counts[operation]
+        if count == len(buffer):
+            buffer.frombytes(bytes(len(buffer) * buffer.itemsize))
+        buffer[count] = elapsed
+        self.counts[operation] = count + 1
+
+    def timings(self, operation):
+        """
+        Gets the timings recorded for the given operation, in the order of the calls.
+
+        Parameters:
+        operation (str): The name of the timed operation.
+
+        Return:
+        numpy.ndarray: A copy of the recorded execution times in seconds.
+        """
+        return np.frombuffer(self.buffers[operation], dtype=np.float64, count=self.counts[operation]).copy()
+
+    def reset(self):
+        """
+        Forgets the recorded timings, keeping the buffers allocated.
+
+        Return:
+        None
+        """
+        for operation in self.OPERATIONS:
+            self.counts[operation] = 0
+
+    def wrap(self, function, operation):
+        """
+        Wraps a function so that the execution time of each call is recorded under the given operation.
+
+        Parameters:
+        function (function): The function (or bound method) to time.
+        operation (str): The name under which the timings are recorded.
+
+        Return:
+        function: The wrapper, returning the same result as the function.
+        """
+        record = self.record
+
+        def wrapper(*args, **kwargs):
+            start_time = perf_counter()
+            result = function(*args, **kwargs)
+            record(operation, perf_counter() - start_time)
+            return result
+
+        wrapper.__wrapped__ = function
+        wrapper.__doc__ = function.__doc__
+        return wrapper
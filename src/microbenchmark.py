@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+from time import perf_counter
+import gc
+import os
+import numpy as np
+
+class Microbenchmark:
+    """
+    Harness for timing short operations reliably. A measurement runs warmup iterations first
+    (filling the caches and letting the interpreter specialize the code), then times a number of
+    independent trials with the garbage collector disabled, optionally with the process pinned
+    to a single CPU so that the scheduler doesn't migrate it between trials.
+
+    The trials are summarized by their median and interquartile range (IQR), which ignore the
+    outliers caused by interruptions, and by a bootstrap confidence interval of the median.
+    """
+
+    def __init__(self, warmup=5, trials=30, cpu=None, disable_gc=True, confidence=0.95, n_bootstrap=1000, seed=0):
+        """
+        Initializes the harness.
+
+        Parameters:
+        warmup (int): The number of untimed runs before the trials.
+        trials (int): The number of timed runs.
+        cpu (int): The CPU the process is pinned to while measuring, None to leave it unpinned.
+        disable_gc (bool): Whether to disable the garbage collector during the trials.
+        confidence (float): The level of the confidence interval of the median.
+        n_bootstrap (int): The number of resamples of the bootstrap.
+        seed (int): The seed of the bootstrap resampling, so that the intervals are reproducible.
+
+        Return:
+        None
+        """
+        if trials < 1:
+            raise ValueError("at least one trial is needed")
+        if cpu is not None and not hasattr(os, "sched_setaffinity"):
+            raise RuntimeError("pinning the process to a CPU needs os.sched_setaffinity (Linux)")
+        self.warmup = warmup
+        self.trials = trials
+        self.cpu = cpu
+        self.disable_gc = disable_gc
+        self.confidence = confidence
+        self.n_bootstrap = n_bootstrap
+        self.seed = seed
+
+    @contextmanager
+    def pinned(self):
+        """
+        Context manager pinning the process to the harness's CPU, then restoring its previous affinity.
+        """
+        if self.cpu is None:
+            yield
+            return
+        previous = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, {self.cpu})
+        try:
+            yield
+        finally:
+            os.sched_setaffinity(0, previous)
+
+    def measure(self, function, n_ops=1):
+        """
+        Times a function over the warmup and trials.
+
+        Parameters:
+        function (function): The function to time, called without arguments.
+        n_ops (int): The number of operations run by each call, to report the time per operation.
+
+        Return:
+        numpy.ndarray: The time per operation of every trial, in seconds.
+        """
+        timings = np.empty(self.trials)
+        with self.pinned():
+            for _ in range(self.warmup):
+                function()
+            gc_was_enabled = gc.isenabled()
+            if self.disable_gc:
+                gc.collect()  # Starts the trials with no pending garbage
+                gc.disable()
+            try:
+                for trial in range(self.trials):
+                    start = perf_counter()
+                    function()
+                    timings[trial] = perf_counter() - start
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+        return timings / n_ops
+
+    def summarize(self, timings):
+        """
+        Summarizes the timings of the trials.
+
+        Parameters:
+        timings (numpy.ndarray): The time of every trial.
+
+        Return:
+        dict: The statistics in the format:
+        {"median": float, "q1": float, "q3": float, "iqr": float, "ci_low": float, "ci_high": float,
+         "mean": float, "trials": int}
+        """
+        timings = np.asarray(timings, dtype=float)
+        q1, median, q3 = np.percentile(timings, [25, 50, 75])
+        # Bootstrap: the spread of the medians of resampled trials gives the interval of the median
+        rng = np.random.default_rng(self.seed)
+        resampled = rng.choice(timings, size=(self.n_bootstrap, len(timings)), replace=True)
+        alpha = (1 - self.confidence) / 2
+        ci_low, ci_high = np.percentile(np.median(resampled, axis=1), [100 * alpha, 100 * (1 - alpha)])
+        return {"median": float(median), "q1": float(q1), "q3": float(q3), "iqr": float(q3 - q1),
+                "ci_low": float(ci_low), "ci_high": float(ci_high), "mean": float(timings.mean()),
+                "trials": len(timings)}
+
+    def run(self, function, n_ops=1):
+        """
+        Times a function and summarizes its trials (see `measure` and `summarize`).
+
+        Parameters:
+        function (function): The function to time, called without arguments.
+        n_ops (int): The number of operations run by each call.
+
+        Return:
+        dict: The statistics of the time per operation.
+        """
+        return self.summarize(self.measure(function, n_ops))
@@ -0,0 +1,152 @@
+import random
+import numpy as np
+
+class RandomPriority:
+    """
+    Draws the Treap priorities as uniform random integers of the given number of bits.
+
+    With 64 bits two nodes practically never share a priority, which keeps the expected depth
+    of a Treap at O(log n). A narrow range (e.g. 7 bits, close to the original 0-99 range)
+    makes priorities collide constantly and the Treap much deeper.
+    """
+
+    def __init__(self, bits=64, seed=None):
+        """
+        Initializes the random generator.
+
+        Parameters:
+        bits (int): The number of random bits of each priority.
+        seed (int): The seed of the generator, None to seed it from the system.
+
+        Returns:
+        None
+        """
+        self.bits = bits
+        self.getrandbits = random.Random(seed).getrandbits
+
+    def __call__(self, key):
+        """
+        Draws the priority of a new node.
+
+        Parameters:
+        key (int): The key of the node (unused).
+
+        Returns:
+        int: The priority of the node.
+        """
+        return self.getrandbits(self.bits)
+
+    def many(self, keys):
+        """
+        Draws the priorities of a batch of new nodes.
+
+        Parameters:
+        keys (list of int): The keys of the nodes.
+
+        Returns:
+        list of int: The priority of each node.
+        """
+        getrandbits, bits = self.getrandbits, self.bits
+        return [getrandbits(bits) for _ in keys]
+
+
+class BatchedPriority:
+    """
+    Draws the Treap priorities from NumPy's PCG64 generator, which produces them in batches
+    of 63-bit integers. Single insertions take the next priority of the current batch, so the
+    generator is only called once every `batch_size` nodes.
+    """
+
+    def __init__(self, batch_size=4096, seed=None):
+        """
+        Initializes the generator and draws the first batch.
+
+        Parameters:
+        batch_size (int): The number of priorities drawn at once.
+        seed (int): The seed of the generator, None to seed it from the system.
+
+        Returns:
+        None
+        """
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.pending = iter(())  # The priorities left in the current batch
+
+    def __call__(self, key):
+        """
+        Takes the priority of a new node from the current batch, drawing a new batch if it is empty.
+
+        Parameters:
+        key (int): The key of the node (unused).
+
+        Returns:
+        int: The priority of the node.
+        """
+        try:
+            return next(self.pending)
+        except StopIteration:
+            self.pending = iter(self.many(range(self.batch_size)))
+            return next(self.pending)
+
+    def many(self, keys):
+        """
+        Draws the priorities of a batch of new nodes in a single call to the generator.
+
+        Parameters:
+        keys (list of int): The keys of the nodes.
+
+        Returns:
+        list of int: The priority of each node.
+        """
+        return self.rng.integers(0, 1 << 63, size=len(keys), dtype=np.int64).tolist()
+
+
+class HashPriority:
+    """
+    Derives the Treap priorities from the keys with the SplitMix64 finalizer, a hash whose
+    output bits look random. The priority of a key never changes, so the same set of keys
+    always gives the same Treap, whatever the insertion order: shapes are reproducible
+    across runs and machines.
+    """
+
+    MASK = (1 << 64) - 1
+
+    def __init__(self, seed=0):
+        """
+        Initializes the hash.
+
+        Parameters:
+        seed (int): Mixed with the keys, to get another reproducible shape.
+
+        Returns:
+        None
+        """
+        self.seed = seed
+
+    def __call__(self, key):
+        """
+        Hashes the key of a new node into its priority.
+
+        Parameters:
+        key (int): The key of the node.
+
+        Returns:
+        int: The priority of the node, between 0 and 2^64 - 1.
+        """
+        mask = self.MASK
+        x = (key + self.seed + 0x9E3779B97F4A7C15) & mask
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & mask
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & mask
+        return x ^ (x >> 31)
+
+    def many(self, keys):
+        """
+        Hashes the keys of a batch of new nodes into their priorities.
+
+        Parameters:
+        keys (list of int): The keys of the nodes.
+
+        Returns:
+        list of int: The priority of each node.
+        """
+        return [self(key) for key in keys]
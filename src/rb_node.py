@@ -3,20 +3,46 @@ class RBNode:
     Class representing a node in a Red-Black Tree.
     
     Each node contains a key, a color, and pointers to its left and right children and its parent.
-    By default, the node's color is set to Red ('R') upon initialization.
+    The color is stored as a boolean (`red`), by default the node is Red upon initialization.
+    The attributes are declared in `__slots__` so that nodes don't carry a `__dict__`.
     """
 
-    def __init__(self, key):
+    __slots__ = ("key", "value", "red", "left", "right", "parent", "size")
+
+    def __init__(self, key, value=None):
         """
         Initializes a new node in the Red-Black Tree with the specified key.
         
         Parameters:
         key (int): The key to store in the node.
+        value: The payload associated with the key, None for trees used as sets.
         
-        Sets the node's color to Red ('R'), and its left, right, and parent pointers to None.
+        Sets the node's color to Red (red = True), and its left, right, and parent pointers to None.
         """
         self.key = key  # The key for the node.
-        self.color = "R"  # By default, new nodes are colored Red ('R').
+        self.value = value  # The payload of the node, only used when the tree is used as a map.
+        self.red = True  # By default, new nodes are colored Red (False means Black).
         self.left = None  # Pointer to the left child node (initially None).
         self.right = None  # Pointer to the right child node (initially None).
         self.parent = None  # Pointer to the parent node (initially None).
+        self.size = 1  # Number of nodes in the subtree, only maintained by trees with order statistics.
+
+    @property
+    def color(self):
+        """
+        The color of the node as a letter, Red ('R') or Black ('B').
+
+        Return:
+        str: 'R' if the node is red, 'B' otherwise.
+        """
+        return 'R' if self.red else 'B'
+
+    @color.setter
+    def color(self, color):
+        """
+        Sets the color of the node from its letter.
+
+        Parameters:
+        color (str): 'R' for Red, 'B' for Black.
+        """
+        self.red = color == 'R'
@@ -0,0 +1,430 @@
+from .avl_tree import AVLTree
+import multiprocessing
+import time
+import numpy as np
+
+class Shard:
+    """
+    The tree of one shard of a `ShardedForest`, living in a worker process.
+    The tree keeps order statistics, so that the forest can sample its keys in O(log n) each.
+    """
+
+    def __init__(self, tree_class):
+        """
+        Initializes the shard with an empty tree.
+
+        Parameters:
+        tree_class (type): The class of the tree (AVLTree, RBTree or Treap).
+
+        Return:
+        None
+        """
+        self.tree_class = tree_class
+        self.tree = tree_class(order_stats=True)
+
+    def insert_many(self, keys):
+        """
+        Inserts a batch of keys into the tree (see `BaseTree.insert_many`).
+
+        Parameters:
+        keys (numpy.ndarray): The keys routed to the shard.
+
+        Return:
+        dict: The aggregate stats returned by the tree.
+        """
+        return self.tree.insert_many(keys)
+
+    def search_many(self, keys):
+        """
+        Searches for a batch of keys (see `BaseTree.search_many`).
+
+        Parameters:
+        keys (numpy.ndarray): The keys routed to the shard.
+
+        Return:
+        numpy.ndarray: A boolean array aligned with 'keys', True where the key is in the tree.
+        """
+        return self.tree.search_many(keys)
+
+    def range(self, lo, hi):
+        """
+        Gets the keys between lo and hi (both included) in ascending order.
+
+        Parameters:
+        lo (int): The lower bound of the range.
+        hi (int): The upper bound of the range.
+
+        Return:
+        list of int: The keys of the shard in the range.
+        """
+        return list(self.tree.range(lo, hi))
+
+    def keys(self):
+        """
+        Gets all the keys of the shard in ascending order.
+
+        Return:
+        list of int: The keys of the shard.
+        """
+        return list(self.tree)
+
+    def sample(self, k, seed=None):
+        """
+        Draws k keys uniformly at random (with replacement) by selecting random ranks.
+
+        Parameters:
+        k (int): The number of keys to draw.
+        seed (int): The seed of the generator, None to seed it from the system.
+
+        Return:
+        list of int: The sampled keys.
+        """
+        size = self.tree.subtree_size(self.tree.root)
+        if not size or k <= 0:
+            return []
+        ranks = np.random.default_rng(seed).integers(0, size, size=k)
+        return [self.tree.select(int(rank)) for rank in ranks]
+
+    def extract(self, lo, hi):
+        """
+        Removes the keys that fall outside the new range of the shard, lo <= key < hi,
+        and rebuilds the tree with the remaining ones in linear time.
+
+        Parameters:
+        lo (int): The lower bound of the new range, None if unbounded.
+        hi (int): The upper bound (excluded) of the new range, None if unbounded.
+
+        Return:
+        list of int: The removed keys in ascending order, to be sent to their new shards.
+        """
+        kept, moved = [], []
+        for key in self.tree:
+            if (lo is not None and key < lo) or (hi is not None and key >= hi):
+                moved.append(key)
+            else:
+                kept.append(key)
+        if moved:
+            self.tree = self.tree_class.from_sorted(kept, order_stats=True)
+        return moved
+
+
+def run_shard(connection, tree_class):
+    """
+    Main loop of a shard's worker process: runs the commands received from the forest on the
+    shard and sends back their results, or the exceptions they raised, until it receives None.
+
+    Parameters:
+    connection (multiprocessing.connection.Connection): The worker's end of the pipe to the forest.
+    tree_class (type): The class of the shard's tree.
+
+    Return:
+    None
+    """
+    shard = Shard(tree_class)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        command, args = message
+        try:
+            connection.send((True, getattr(shard, command)(*args)))
+        except Exception as error:
+            connection.send((False, error))
+    connection.close()
+
+
+class ShardedForest:
+    """
+    An index splitting the key space into ranges (shards), each one stored in a tree living in its own
+    worker process, so that the batches run on several cores. Shard i holds the keys k such that
+    boundaries[i - 1] <= k < boundaries[i].
+
+    The batched operations route their keys to the shards and run on all of them in parallel, range
+    scans query the shards overlapping the range and concatenate their results in shard order.
+    The boundaries are placed at the quantiles of a sample of the keys, so the shards stay even on
+    skewed distributions: they are set by the first batch and moved again by `rebalance` whenever a
+    shard grows `rebalance_factor` times larger than the average one.
+
+    The forest has set semantics (like `insert_many`) and must be closed, or used as a context manager,
+    to stop its workers.
+    """
+
+    def __init__(self, tree_class=AVLTree, n_shards=4, boundaries=None, sample_size=10000, rebalance_factor=2.0):
+        """
+        Starts the worker processes, one per shard.
+
+        Parameters:
+        tree_class (type): The class of the shards' trees: AVLTree, RBTree or Treap.
+        n_shards (int): The number of shards (and worker processes).
+        boundaries (list of int): The n_shards - 1 ascending boundaries of the shards,
+                                  None to take them from the first batch.
+        sample_size (int): The number of keys sampled to place the boundaries.
+        rebalance_factor (float): Rebalance when a shard holds that many times the average
+                                  number of keys, None to only rebalance explicitly.
+
+        Return:
+        None
+        """
+        if boundaries is not None and len(boundaries) != n_shards - 1:
+            raise ValueError(f"{n_shards} shards need {n_shards - 1} boundaries, got {len(boundaries)}")
+        self.tree_class = tree_class
+        self.n_shards = n_shards
+        self.boundaries = None if boundaries is None else np.asarray(boundaries)
+        self.sample_size = sample_size
+        self.rebalance_factor = rebalance_factor
+        self.counts = [0] * n_shards  # Number of keys of every shard
+        self.rebalances = 0  # Number of rebalances done
+
+        self.connections, self.workers = [], []
+        for _ in range(n_shards):
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=run_shard, args=(worker_connection, tree_class), daemon=True)
+            worker.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Stops the worker processes. The keys of the forest are lost.
+
+        Return:
+        None
+        """
+        for connection, worker in zip(self.connections, self.workers):
+            if worker.is_alive():
+                connection.send(None)
+            worker.join()
+            connection.close()
+        self.connections, self.workers = [], []
+
+    def call(self, requests):
+        """
+        Sends commands to several shards at once, then waits for all their results,
+        so that the shards work in parallel.
+
+        Parameters:
+        requests (dict): Maps the index of each shard to a (command, args) tuple.
+
+        Return:
+        dict: Maps the index of each shard to the result of its command.
+
+        Raises:
+        Exception: The first exception raised by a command, once every shard has answered.
+        """
+        if not self.workers:
+            raise RuntimeError("the forest is closed")
+        for index, request in requests.items():
+            self.connections[index].send(request)
+        results, error = {}, None
+        for index in requests:
+            ok, result = self.connections[index].recv()
+            if ok:
+                results[index] = result
+            elif error is None:
+                error = result
+        if error is not None:
+            raise error
+        return results
+
+    def route(self, keys):
+        """
+        Finds the shard of every key.
+
+        Parameters:
+        keys (numpy.ndarray): The keys to route.
+
+        Return:
+        numpy.ndarray: The index of the shard of each key.
+        """
+        if self.boundaries is None:
+            return np.zeros(len(keys), dtype=np.intp)
+        return np.searchsorted(self.boundaries, keys, side="right")
+
+    def partition(self, keys):
+        """
+        Splits a batch of keys by shard.
+
+        Parameters:
+        keys (iterable of int): The keys, a list or a NumPy array.
+
+        Return:
+        dict: Maps the index of each shard receiving keys to a tuple
+        (numpy.ndarray: its keys, numpy.ndarray: their positions in the batch).
+        """
+        keys = np.asarray(keys)
+        shards = self.route(keys)
+        order = np.argsort(shards, kind="stable")
+        starts = np.searchsorted(shards[order], np.arange(self.n_shards + 1))
+        parts = {}
+        for index in range(self.n_shards):
+            positions = order[starts[index]:starts[index + 1]]
+            if len(positions):
+                parts[index] = (keys[positions], positions)
+        return parts
+
+    def insert_many(self, keys):
+        """
+        Inserts a batch of keys with set semantics, every shard inserting its part in parallel.
+        The first batch sets the boundaries of the shards, and a rebalance follows the batch if it
+        left the shards uneven.
+
+        Parameters:
+        keys (iterable of int): The keys to insert, a list or a NumPy array.
+
+        Return:
+        dict: Aggregate stats in the format:
+        {"inserted": int, "skipped": int, "strategy": str, "elapsed": float (seconds)}
+        """
+        start = time.perf_counter()
+        keys = np.asarray(keys)
+        if self.boundaries is None and len(keys):
+            # The shards hold every key once, repeated keys would weigh too much in the quantiles
+            distinct = np.unique(keys)
+            self.boundaries = self.quantiles(distinct[np.random.default_rng().integers(0, len(distinct), self.sample_size)])
+        stats = self.insert_parts(self.partition(keys))
+        if self.rebalance_factor and max(self.counts) > self.rebalance_factor * len(self) / self.n_shards:
+            self.rebalance()
+        stats["elapsed"] = time.perf_counter() - start
+        return stats
+
+    def insert_parts(self, parts):
+        """
+        Sends the parts of a batch to their shards and updates the counts of keys.
+
+        Parameters:
+        parts (dict): The batch split by shard, as returned by `partition`.
+
+        Return:
+        dict: The number of keys inserted and skipped by the shards, and the strategy "sharded".
+        """
+        results = self.call({index: ("insert_many", (part,)) for index, (part, _) in parts.items()})
+        for index, result in results.items():
+            self.counts[index] += result["inserted"]
+        return {"inserted": sum(result["inserted"] for result in results.values()),
+                "skipped": sum(result["skipped"] for result in results.values()),
+                "strategy": "sharded"}
+
+    def search_many(self, keys):
+        """
+        Searches for a batch of keys, every shard searching for its part in parallel.
+
+        Parameters:
+        keys (iterable of int): The keys to search for, a list or a NumPy array.
+
+        Return:
+        numpy.ndarray: A boolean array aligned with 'keys', True where the key is in the forest.
+        """
+        found = np.zeros(len(keys), dtype=bool)
+        parts = self.partition(keys)
+        results = self.call({index: ("search_many", (part,)) for index, (part, _) in parts.items()})
+        for index, result in results.items():
+            found[parts[index][1]] = result
+        return found
+
+    def search_key(self, key):
+        """
+        Searches for the given key in its shard.
+
+        Parameters:
+        key (int): The key to search for.
+
+        Return:
+        bool: True if the key is found, False if not.
+        """
+        return bool(self.search_many([key])[0])
+
+    def range(self, lo, hi):
+        """
+        Gets the keys between lo and hi (both included) in ascending order. The shards overlapping
+        the range scan it in parallel, and their results are concatenated in shard order.
+
+        Parameters:
+        lo (int): The lower bound of the range.
+        hi (int): The upper bound of the range.
+
+        Return:
+        list of int: The keys k such that lo <= k <= hi, in ascending order.
+        """
+        if lo > hi:
+            return []
+        first, last = self.route(np.asarray([lo, hi]))
+        results = self.call({index: ("range", (lo, hi)) for index in range(first, last + 1)})
+        return [key for index in range(first, last + 1) for key in results[index]]
+
+    def __iter__(self):
+        """
+        Iterates over the keys of the forest in ascending order, one shard at a time.
+
+        Return:
+        generator: The keys in ascending order.
+        """
+        for index in range(self.n_shards):
+            yield from self.call({index: ("keys", ())})[index]
+
+    def __len__(self):
+        """
+        Gets the number of keys in the forest.
+
+        Return:
+        int: The number of keys.
+        """
+        return sum(self.counts)
+
+    def quantiles(self, sample):
+        """
+        Places the boundaries of the shards at the quantiles of a sample of keys,
+        so that every shard receives the same share of the sampled distribution.
+
+        A key repeated in the sample (drawn with replacement, or repeated in the first batch) can
+        span several quantiles. Equal boundaries would leave the shards between them empty for good,
+        and keep the others over the rebalance threshold, so each boundary is moved up to the next
+        distinct sampled key above the previous one: every shard then gets at least one sampled key
+        when the sample holds at least n_shards distinct keys.
+
+        Parameters:
+        sample (numpy.ndarray): The sampled keys.
+
+        Return:
+        numpy.ndarray: The n_shards - 1 strictly ascending boundaries.
+        """
+        values = np.unique(sample)
+        boundaries = np.quantile(sample, np.arange(1, self.n_shards) / self.n_shards, method="higher")
+        # Position of each boundary among the distinct keys, made strictly increasing from 1
+        steps = np.arange(1, self.n_shards)
+        index = np.maximum.accumulate(np.maximum(np.searchsorted(values, boundaries), steps) - steps) + steps
+        # Positions past the largest key stand for the keys above it, whose shards stay empty anyway
+        extra = values[-1] + 1 + np.arange(max(0, index[-1] + 1 - len(values)), dtype=values.dtype)
+        return np.concatenate([values, extra])[index]
+
+    def rebalance(self):
+        """
+        Moves the boundaries of the shards to the quantiles of the current keys and moves the keys
+        accordingly. Every shard contributes a random sample proportional to its number of keys,
+        drawn in parallel through its order statistics, then gives away the keys outside its new range.
+
+        Return:
+        None
+        """
+        total = len(self)
+        if not total:
+            return
+        requests = {index: ("sample", (-(-self.sample_size * count // total),))
+                    for index, count in enumerate(self.counts) if count}
+        sample = np.concatenate([np.asarray(keys) for keys in self.call(requests).values()])
+        self.boundaries = self.quantiles(sample)
+
+        bounds = [None] + self.boundaries.tolist() + [None]
+        moved = self.call({index: ("extract", (bounds[index], bounds[index + 1])) for index in range(self.n_shards)})
+        for index, keys in moved.items():
+            self.counts[index] -= len(keys)
+        moved = [key for keys in moved.values() for key in keys]
+        if moved:
+            self.insert_parts(self.partition(moved))
+        self.rebalances += 1
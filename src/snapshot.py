@@ -0,0 +1,46 @@
+from .base_tree import BaseTree
+
+class Snapshot(BaseTree):
+    """
+    Read-only view of a persistent tree (see `BaseTree.snapshot`), frozen at the time it was taken.
+
+    It shares the nodes of the tree, and supports the read operations of `BaseTree`: searches
+    (`search_key`, `search_many`, `get`), iteration, range scans and, if the tree keeps subtree
+    sizes, the order statistics queries. Every write raises a TypeError.
+    """
+
+    def __init__(self, tree):
+        """
+        Initializes the view on the current root of the tree.
+
+        Parameters:
+        tree (BaseTree): The persistent tree to take the view of.
+
+        Return:
+        None
+        """
+        self.root = tree.root
+        self.order_stats = tree.order_stats
+
+    def show(self):
+        """
+        Prints the keys of the view in ascending order.
+
+        Return:
+        None
+        """
+        for key in self:
+            print("key:", key)
+
+    def read_only(self, *args, **kwargs):
+        """
+        Rejects the operations that would modify the view.
+
+        Raises:
+        TypeError: Always, snapshots are read-only.
+        """
+        raise TypeError("snapshots are read-only")
+
+    insert_node = delete_node = insert_many = read_only
+    right_rotate = left_rotate = read_only
+    __setitem__ = __delitem__ = read_only
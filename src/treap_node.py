@@ -4,21 +4,27 @@ class TreapNode:
     """
     Class representing a node in a Treap (a randomized binary search tree).
     
-    Each node contains a key, a priority (randomly assigned), and pointers to its left and right children.
+    Each node contains a key, a priority (given by the Treap's priority source), and pointers to its left and right children.
     The priority helps maintain the heap property of the Treap.
+    The attributes are declared in `__slots__` so that nodes don't carry a `__dict__`.
     """
 
-    def __init__(self, key):
+    __slots__ = ("key", "value", "priority", "left", "right", "size")
+
+    def __init__(self, key, value=None, priority=None):
         """
-        Initializes a new node in the Treap with the specified key and a random priority.
+        Initializes a new node in the Treap with the specified key and priority.
         
         Parameters:
         key (int): The key to store in the node.
+        value: The payload associated with the key, None for trees used as sets.
+        priority (int): The priority of the node, a random 64-bit integer if None.
         
-        Sets the node's priority to a random value between 0 and 99, and initializes
-        the left and right pointers to None.
+        Initializes the left and right pointers to None.
         """
         self.key = key  # The key for the node, used for binary search tree property.
-        self.priority = random.randint(0, 99)  # Random priority to maintain heap property.
+        self.value = value  # The payload of the node, only used when the tree is used as a map.
+        self.priority = random.getrandbits(64) if priority is None else priority  # Priority to maintain heap property.
         self.left = None  # Pointer to the left child node (initially None).
-        self.right = None  # Pointer to the right child node (initially None).
\ No newline at end of file
+        self.right = None  # Pointer to the right child node (initially None).
+        self.size = 1  # Number of nodes in the subtree, only maintained by trees with order statistics.
\ No newline at end of file
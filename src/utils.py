@@ -1,50 +1,27 @@
+from .dataset_generator import DatasetGenerator
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import curve_fit
-from scipy import stats
-from sklearn.metrics import r2_score
-import seaborn as sns
 import time
 import json
 import os
 
 class Helper:
     """
-    A utility class containing helper methods for handling results, dataset generation, and timing functions.
+    A utility class containing helper methods for handling results and dataset generation.
     
+    The plotting and fitting libraries (matplotlib, seaborn, scipy, sklearn) are only imported
+    by the methods using them, so importing this module stays cheap.
+
     The `Helper` class includes static methods to:
-    - Measure the execution time of functions.
     - Generate a dataset
     - Load data from a file.
     - Save data into a file
     - Visualize dataset distribution
     """
 
-    @staticmethod
-    def timing_decorator(func):
-        """
-        A decorator that measures the execution time of a function.
-        
-        This decorator wraps around a function, calculates the time taken to execute the function,
-        and returns both the result of the function and the elapsed time.
-
-        Parameters:
-        func (function): The function to be wrapped and timed.
-
-        Returns:
-        tuple: A tuple containing the result of the function and the execution time in seconds.
-        """
-        def wrapper(*args, **kwargs):
-            start_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            elapsed_time = time.perf_counter() - start_time
-            return result, elapsed_time  # Return both the function result and execution time
-        return wrapper
-
     @staticmethod
     def save_dataset(dataset):
         """
-        Save dataset into a json file with a timestamp suffix in the filename.
+        Save dataset in the binary format (see `save_dataset_binary`) with a timestamp suffix in the directory name.
 
         Parameters:
         dataset (dict): A dictionary in the format:
@@ -52,20 +29,102 @@ class Helper:
         containing the dataset to be saved.
 
         File format:
-        The file will be saved in the './data/' directory with a filename that includes a timestamp
+        The dataset will be saved in a directory of './data/' whose name includes a timestamp
         (format: YYYYMMDD_HHMMSS).
         """
         try:
             timestamp = time.strftime("%Y%m%d-%H%M%S")
-            filename = f"data/dataset1M_{timestamp}.json"
-
-            with open(filename, "w") as file:
-                json.dump(dataset, file, indent=4)
+            Helper.save_dataset_binary(dataset, f"data/dataset1M_{timestamp}")
             return True
         except Exception as e:
             print(f"Error saving dataset: {e}")
             return False
 
+    @staticmethod
+    def save_dataset_binary(dataset, path):
+        """
+        Save dataset in the binary format: a directory holding one NumPy .npy file of int64 keys per
+        distribution (e.g. 'random.npy' and 'skewed.npy'). A .npy file is a small header followed by the
+        raw array, so `read_dataset` can memory-map it instead of parsing it.
+
+        Parameters:
+        dataset (dict): A dictionary in the format:
+        {'random':[], 'skewed': []}
+        path (str): The directory to write, created if needed.
+        """
+        os.makedirs(path, exist_ok=True)
+        for distrib_key, keys in dataset.items():
+            np.save(os.path.join(path, f"{distrib_key}.npy"), np.asarray(keys, dtype=np.int64))
+
+    @staticmethod
+    def read_dataset(path, mmap=True):
+        """
+        Read a dataset saved in the binary format, or a JSON dataset (if path ends with '.json').
+
+        Parameters:
+        path (str): The directory of the binary dataset, or the JSON file.
+        mmap (bool): Whether to memory-map the binary files (read-only) instead of loading them.
+                     The keys are then read from disk when they are used.
+
+        Return:
+        (dict): The dataset in the format:
+        {'random': numpy.ndarray, 'skewed': numpy.ndarray} (lists for a JSON dataset)
+        """
+        if path.endswith(".json"):
+            return Helper.read_json(path)
+        dataset = {}
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith(".npy"):
+                dataset[filename[:-len(".npy")]] = np.load(os.path.join(path, filename), mmap_mode="r" if mmap else None)
+        return dataset
+
+    @staticmethod
+    def convert_json_dataset(filename, path=None):
+        """
+        Convert a JSON dataset into the binary format.
+
+        Parameters:
+        filename (str): The JSON dataset to convert.
+        path (str): The directory to write, by default the JSON file's path without its extension
+                    (data/dataset10.json -> data/dataset10).
+
+        Return:
+        (str): The directory of the binary dataset.
+        """
+        if path is None:
+            path = os.path.splitext(filename)[0]
+        Helper.save_dataset_binary(Helper.read_json(filename), path)
+        return path
+
+    @staticmethod
+    def iter_chunks(keys, chunk_size=65536):
+        """
+        Yield the keys of a distribution in chunks of Python ints, reading a memory-mapped
+        array one chunk at a time.
+
+        Parameters:
+        keys (list or numpy.ndarray): The keys of the distribution.
+        chunk_size (int): The number of keys per chunk.
+
+        Return:
+        generator: Lists of at most chunk_size keys, in order.
+        """
+        for start in range(0, len(keys), chunk_size):
+            yield Helper.as_keys(keys[start:start + chunk_size])
+
+    @staticmethod
+    def as_keys(keys):
+        """
+        Convert the keys of a distribution (or part of it) into a list of Python ints.
+
+        Parameters:
+        keys (list or numpy.ndarray): The keys.
+
+        Return:
+        list of int: The keys.
+        """
+        return keys.tolist() if hasattr(keys, "tolist") else list(keys)
+
     @staticmethod
     def generate_datasets(dataset_size):
         """
@@ -73,9 +132,11 @@ class Helper:
         - 1M Random uniform
         - 1M Random skewed
 
+        The keys are distinct integers between 1 and 100 * dataset_size. For datasets too large
+        to hold in memory, use `DatasetGenerator(dataset_size).write(path)` instead.
+
         Parameters:
         dataset_size (int): The size of the dataset
-        max_val (int): maximum value in the range
 
         Returns:
         dict: The generated dataset in the format:
@@ -84,23 +145,13 @@ class Helper:
         'skewed': skewed.tolist()
         }
         """
-        min_val = 1
-        max_val = dataset_size*100
+        # Drawn in chunks without materializing the key range (see DatasetGenerator)
+        generated = DatasetGenerator(dataset_size).generate()
 
-        # Generating random uniform array
-        random = np.random.choice(np.arange(min_val, max_val), size=dataset_size, replace=False)
-
-        # Generating random skewed array
-        skew_factor=2.0
-        pool = np.arange(min_val, max_val + 1)
-        probabilities = np.exp(-skew_factor * (pool - min_val) / (max_val - min_val))
-        probabilities /= probabilities.sum()
-        skewed = np.random.choice(pool, size=dataset_size, replace=False, p=probabilities)
-
-        # Create the dataset dictionary -> from np arrays to lists so that they can be saved into a json file
+        # Create the dataset dictionary -> from np arrays to lists
         datasets = {
-        'random': random.tolist(),
-        'skewed': skewed.tolist()
+        'random': generated['random'].tolist(),
+        'skewed': generated['skewed'].tolist()
         }
         return datasets
     
@@ -112,6 +163,9 @@ class Helper:
         dataset (dict): A dictionary containing the dataset in the format:
         {'random':[], 'skewed': []}
         """
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         for key, array in dataset.items():
             plt.figure(figsize=(10, 6))
             sns.histplot(array, kde=True, bins=30, color='blue')
@@ -121,58 +175,147 @@ class Helper:
             plt.show()
 
     @staticmethod
-    def save_search_results(exec_times, data_sizes):
+    def results_path(name):
         """
-        Saves the results of the simulation into a JSON file with a unique filename.
+        Get the path of a results file or directory in the data/results folder, creating the folder if needed.
+
+        Parameters:
+        name (str): The name of the results file or directory.
 
-        The filename is generated dynamically using:
+        Return:
+        (str): The path in the results folder.
+        """
+        folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "results")
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, name)
+
+    @staticmethod
+    def save_columns(path, columns, metadata):
+        """
+        Saves results in the columnar format: a directory holding one NumPy .npy file per column
+        and a 'metadata.json' file describing them. The columns are stored as raw binary arrays,
+        which `read_columns` can memory-map instead of parsing.
+
+        Parameters:
+        path (str): The directory to write, created if needed.
+        columns (dict): Maps the name of every column to its values (list or NumPy array).
+        metadata (dict): Information about the results, saved with the list of columns and their lengths.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name, values in columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(values))
+        metadata = dict(metadata, columns={name: len(values) for name, values in columns.items()})
+        with open(os.path.join(path, "metadata.json"), "w") as file:
+            json.dump(metadata, file, indent=4)
+
+    @staticmethod
+    def read_columns(path, mmap=True, max_points=None):
+        """
+        Reads results saved in the columnar format.
+
+        Parameters:
+        path (str): The directory of the results.
+        mmap (bool): Whether to memory-map the columns (read-only) instead of loading them.
+        max_points (int): If given, every column is downsampled to at most max_points values by
+                          keeping one value every ceil(length / max_points). The downsampled columns
+                          are views of the mapped files, so only the kept values are read from disk.
+
+        Return:
+        tuple: (dict: the metadata, dict: the columns as NumPy arrays, numpy.ndarray: the indexes of the
+        kept values in the full columns, for the longest column)
+        """
+        with open(os.path.join(path, "metadata.json"), "r") as file:
+            metadata = json.load(file)
+        length = max(metadata["columns"].values(), default=0)
+        step = max(1, -(-length // max_points)) if max_points else 1
+        columns = {}
+        for name in metadata["columns"]:
+            values = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            columns[name] = values[::step]
+        return metadata, columns, np.arange(0, length, step)
+
+    @staticmethod
+    def save_search_results(exec_times, data_sizes, statistics=None):
+        """
+        Saves the results of the simulation in the columnar format (see `save_columns`), in a directory
+        of the results folder with a unique name.
+
+        The name is generated dynamically using:
         - The final dataset size analyzed
         - The number of steps in between data sizes
         - A timestamp for uniqueness
 
-        Format:
-        {
-            "Exec_times": { "AVL": [], "RB": [], "Treap": []},
-            "Data_sizes": []
-        }
+        Columns: one per structure ("AVL", "RB", ...) with its execution times, "Data_sizes", and
+        one per structure and statistic ("AVL.ci_low", ...) when the statistics are given.
 
         Parameters:
         exec_times (dict): The results of the simulation, in the format:
                         { "AVL": [], "RB": [], "Treap": []}
         data_sizes (list of int): The dataset sizes that correspond to the execution times.
+        statistics (dict): Optional spread of the execution times (see `Benchmark.stats_search`), in the format:
+                        { "AVL": {"q1": [], "q3": [], "ci_low": [], "ci_high": []}, ...}
 
         Returns:
-        bool: True if the file is saved successfully, False otherwise.
+        bool: True if the results are saved successfully, False otherwise.
         """
         try:
-            final_size = data_sizes[-1] if data_sizes else "unknown"
+            final_size = data_sizes[-1] if len(data_sizes) else "unknown"
             num_steps = len(data_sizes)
             timestamp = time.strftime("%Y%m%d-%H%M%S")
-            filename = f"data/results/search_results_{final_size}_steps{num_steps}_{timestamp}.json"
-
-            results = {
-            "Exec_times": exec_times,
-            "Data_sizes": data_sizes
-            }
-
-            with open(filename, "w") as file:
-                json.dump(results, file, indent=4)
+            path = Helper.results_path(f"search_results_{final_size}_steps{num_steps}_{timestamp}")
+
+            columns = dict(exec_times, Data_sizes=data_sizes)
+            metadata = {"simulation": "search", "structures": list(exec_times), "unit": "seconds",
+                        "timestamp": timestamp}
+            if statistics:
+                columns.update({f"{struc_key}.{stat}": values for struc_key, stats in statistics.items()
+                                for stat, values in stats.items()})
+                metadata["statistics"] = list(next(iter(statistics.values())))
+            Helper.save_columns(path, columns, metadata)
             return True
         except Exception as e:
             print(f"Error saving results: {e}")
             return False
-        
+
+    @staticmethod
+    def read_search_results(name, max_points=None):
+        """
+        Reads search results saved in the columnar format from the results folder.
+
+        Parameters:
+        name (str): The name of the results directory.
+        max_points (int): The maximum number of data sizes to load, None to load them all.
+
+        Return:
+        (dict): The results in the format:
+        {
+            "Exec_times": { "AVL": numpy.ndarray, "RB": numpy.ndarray, ...},
+            "Data_sizes": numpy.ndarray,
+            "Stats": { "AVL": {"q1": numpy.ndarray, ...}, ...}  (only if the statistics were saved)
+        }
+        """
+        metadata, columns, _ = Helper.read_columns(Helper.results_path(name), max_points=max_points)
+        results = {
+            "Exec_times": {struc_key: columns[struc_key] for struc_key in metadata["structures"]},
+            "Data_sizes": columns["Data_sizes"]
+        }
+        if metadata.get("statistics"):
+            results["Stats"] = {struc_key: {stat: columns[f"{struc_key}.{stat}"] for stat in metadata["statistics"]}
+                                for struc_key in metadata["structures"]}
+        return results
+
     @staticmethod
-    def save_insert_results(results):
+    def save_insert_results(results, dataset_sizes=None):
         """
-        Saves the results of the simulation into a JSON file with a unique filename.
+        Saves the results of the simulation in the columnar format (see `save_columns`), in a directory
+        of the results folder with a unique name.
 
-        The filename is generated dynamically using:
+        The name is generated dynamically using:
         - The final dataset size analyzed
-        - The number of steps in between data sizes
         - A timestamp for uniqueness
 
-        The json file will follow the same format as the results parameter's
+        Columns: one per distribution and structure ("random.AVL", "skewed.RB", ...) with the cumulative
+        insertion times, and "Data_sizes" when the points aren't one per key (block-timed insertion).
 
         Parameters:
         results (dict): The results of the insertion simulation in the format:
@@ -180,29 +323,58 @@ class Helper:
         "random": { "AVL": [], "RB": [], "Treap": []},
         "skewed": { "AVL": [], "RB": [], "Treap": []}
         }
+        dataset_sizes (numpy.ndarray): The dataset size of each point, None for one point per key.
 
         Returns:
-        bool: True if the file is saved successfully, False otherwise.
+        bool: True if the results are saved successfully, False otherwise.
         """
         try:
-            final_size = len(results['random']['AVL'])
+            if dataset_sizes is None:
+                final_size = len(next(iter(next(iter(results.values())).values())))
+            else:
+                final_size = int(dataset_sizes[-1]) + 1
             timestamp = time.strftime("%Y%m%d-%H%M%S")
-
-            sibling_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-            os.makedirs(sibling_folder, exist_ok=True)
-            file_path = os.path.join(sibling_folder, f"results/insert_results_{final_size}_{timestamp}.json")
-
-            with open(file_path, "w") as file:
-                json.dump(results, file, indent=4)
+            path = Helper.results_path(f"insert_results_{final_size}_{timestamp}")
+
+            columns = {f"{distrib_key}.{struc_key}": times
+                       for distrib_key, structures in results.items() for struc_key, times in structures.items()}
+            metadata = {"simulation": "insertion", "distributions": list(results),
+                        "structures": list(next(iter(results.values()))), "unit": "seconds (cumulative)",
+                        "timestamp": timestamp}
+            if dataset_sizes is not None:
+                columns["Data_sizes"] = dataset_sizes
+            Helper.save_columns(path, columns, metadata)
             return True
         except Exception as e:
             print(f"Error saving results: {e}")
             return False
 
+    @staticmethod
+    def read_insert_results(name, max_points=None):
+        """
+        Reads insertion results saved in the columnar format from the results folder.
+
+        Parameters:
+        name (str): The name of the results directory.
+        max_points (int): The maximum number of points to load per curve, None to load them all.
+
+        Return:
+        tuple: (dict: the results in the format { "random": { "AVL": numpy.ndarray, ...}, "skewed": {...}},
+        numpy.ndarray: the dataset size of each loaded point)
+        """
+        metadata, columns, sizes = Helper.read_columns(Helper.results_path(name), max_points=max_points)
+        if "Data_sizes" in columns:  # Block-timed insertion: one point per block
+            sizes = np.asarray(columns["Data_sizes"])
+        results = {distrib_key: {struc_key: columns[f"{distrib_key}.{struc_key}"]
+                                 for struc_key in metadata["structures"]}
+                   for distrib_key in metadata["distributions"]}
+        return results, sizes
+
     @staticmethod
     def read_results_file(filename):
         """
         Read the given JSON file from the results folder and return its contents
+        (results saved before the columnar format)
 
         Parameters:
         filename (str): the name of the json file to read
@@ -235,7 +407,25 @@ class Helper:
         return content
     
     @staticmethod
-    def check_log_trend(search_results):
+    def finish_plot(name, plot_dir=None):
+        """
+        Shows the current figure, or saves it to a PNG file when running headless.
+
+        Parameters:
+        name (str): The name of the figure, used as file name.
+        plot_dir (str): The directory where the figure is saved, None to show it.
+        """
+        import matplotlib.pyplot as plt
+
+        if plot_dir is None:
+            plt.show()
+        else:
+            os.makedirs(plot_dir, exist_ok=True)
+            plt.savefig(os.path.join(plot_dir, f"{name}.png"))
+            plt.close()
+
+    @staticmethod
+    def check_log_trend(search_results, plot_dir=None):
         """
         Check if the search results exhibit a logarithmic trend for each of the structures.
         Plots them individually with their logarithmic fit.
@@ -244,41 +434,65 @@ class Helper:
         search_results (dict): A dictionary containing the results of the search simulation in the format:
         {
             "Exec_times": { "AVL": [], "RB": [], "Treap": []},
-            "Data_sizes": []
+            "Data_sizes": [],
+            "Stats": { "AVL": {"ci_low": [], "ci_high": [], ...}, ...}  (optional)
         }
+        When the statistics are given, the fit weights every point by the width of its confidence
+        interval, and the plot shows the intervals as error bars.
+        plot_dir (str): The directory where the plots are saved, None to show them.
+
+        Returns:
+        dict: The fitted parameters in the format: { "AVL": {"a": float, "b": float, "r2": float}, ...}
         """
+        import matplotlib.pyplot as plt
+        from scipy.optimize import curve_fit
+        from sklearn.metrics import r2_score
+
         def log_func(x, a, b):
             return a + b * np.log(x)
         
+        fits = {}
         for struc_key, struc_times in search_results["Exec_times"].items():
 
             x = np.array(search_results["Data_sizes"])
             y = np.array(struc_times)
+            stats = search_results.get("Stats", {}).get(struc_key)
+            sigma = None
+            if stats:
+                # Half width of the confidence intervals, kept positive for the weighting
+                sigma = np.maximum((np.array(stats["ci_high"]) - np.array(stats["ci_low"])) / 2, np.finfo(float).tiny)
             # Perform curve fitting
-            params, covariance = curve_fit(log_func, x, y)
+            params, covariance = curve_fit(log_func, x, y, sigma=sigma)
             a, b = params  # Extract fitted parameters
 
             # Compute fitted values
             y_fit = log_func(x, a, b)
 
             # Plot the original data and the logarithmic fit
-            plt.scatter(x, y, label="Original Data", color='blue')
+            if stats:
+                errors = [y - np.array(stats["ci_low"]), np.array(stats["ci_high"]) - y]
+                plt.errorbar(x, y, yerr=errors, fmt='o', label="Median (confidence interval)", color='blue', capsize=3)
+            else:
+                plt.scatter(x, y, label="Original Data", color='blue')
             plt.plot(x, y_fit, 'r--', label=f"Logarithmic Fit: y = {a:.7f} + {b:.7f} log(x)", linewidth=2)
             plt.xlabel("Input Size")
             plt.ylabel("Runtime")
             plt.title(f"Logarithmic Fit Analysis - BST Search ({struc_key})")
             plt.legend()
             plt.grid()
-            plt.show()
+            Helper.finish_plot(f"search_log_fit_{struc_key}", plot_dir)
 
             # Print the fitted parameters
             print(f"{struc_key} - Fitted Parameters: a = {a}, b = {b}")
             # Check goodness of fit (r^2 value)
             r2 = r2_score(y, y_fit)
             print(f"R²: {r2}")
+            fits[struc_key] = {"a": float(a), "b": float(b), "r2": float(r2)}
+
+        return fits
 
     @staticmethod
-    def check_nlogn_trend(insertion_results):
+    def check_nlogn_trend(insertion_results, dataset_sizes=None, plot_dir=None):
         """
         Check if the search results exhibit a n log n trend for each of the structures.
         Plots them individually with their n log n fit.
@@ -289,12 +503,25 @@ class Helper:
         "random": { "AVL": [], "RB": [], "Treap": []},
         "skewed": { "AVL": [], "RB": [], "Treap": []}
         }
+        dataset_sizes (numpy.ndarray): The dataset size of each point (e.g. of downsampled results),
+                                       by default 0, 1, 2, ...
+        plot_dir (str): The directory where the plots are saved, None to show them.
+
+        Returns:
+        dict: The fitted parameters in the format:
+        { "random": { "AVL": {"slope": float, "intercept": float, "r2": float}, ...}, "skewed": {...}}
         """
 
+        import matplotlib.pyplot as plt
+        from scipy import stats
+
         # Define dataset sizes (x-axis) starting from 0.
-        dataset_sizes = np.arange(len(next(iter(insertion_results['random'].values()))))
+        if dataset_sizes is None:
+            dataset_sizes = np.arange(len(next(iter(next(iter(insertion_results.values())).values()))))
         
+        fits = {}
         for distrib_key, exect_dict in insertion_results.items():
+            fits[distrib_key] = {}
             for struc_key, struc_times in exect_dict.items():
 
                 x = np.array(dataset_sizes[1:]) #skippping 0 point
@@ -315,8 +542,12 @@ class Helper:
                 plt.xlabel('Dataset Size')
                 plt.ylabel('Cumulative Insertion Time (s)')
                 plt.legend()
-                plt.show()
+                Helper.finish_plot(f"insert_nlogn_fit_{distrib_key}_{struc_key}", plot_dir)
 
                 print(f"{distrib_key} {struc_key} - Fitted parameters: slope={slope}, intercept={intercept}")
                 # Output the R-squared value to assess the fit quality
-                print(f"R-squared value: {r_value**2}")
\ No newline at end of file
+                print(f"R-squared value: {r_value**2}")
+                fits[distrib_key][struc_key] = {"slope": float(slope), "intercept": float(intercept),
+                                                "r2": float(r_value ** 2)}
+
+        return fits
\ No newline at end of file
@@ -0,0 +1,122 @@
+import pickle
+import unittest
+import numpy as np
+from src.array_avl_tree import ArrayAVLTree
+from src.avl_tree import AVLTree
+
+class TestArrayAVLTree(unittest.TestCase):
+    """
+    Unit test class for the `ArrayAVLTree` class, using Python's built-in unittest framework.
+    """
+
+    def test_initialization(self):
+        """Test if a new tree is initialized properly."""
+        tree = ArrayAVLTree()
+        self.assertEqual(tree.root, 0)
+        self.assertEqual(tree.size, 0)
+
+    def test_insert_multiple_nodes(self):
+        """Test insertion of multiple nodes and BST structure."""
+        tree = ArrayAVLTree()
+        for key in [10, 20, 30]:
+            tree.insert_node(key)
+
+        # Check if root and children are correct
+        self.assertEqual(tree.keys[tree.root], 20)
+        self.assertEqual(tree.heights[tree.root], 2)
+        self.assertEqual(tree.keys[tree.left[tree.root]], 10)
+        self.assertEqual(tree.keys[tree.right[tree.root]], 30)
+
+        # Insert 4,5,6-th nodes and check updated structure
+        for key in [40, 50, 25]:
+            tree.insert_node(key)
+        self.assertEqual(tree.keys[tree.root], 30)
+        self.assertEqual(tree.heights[tree.root], 3)
+
+    def test_same_shape_as_avl_tree(self):
+        """Test that the tree has the same shape as the pointer-based AVLTree."""
+        keys = [41, 20, 65, 11, 29, 50, 91, 32, 72, 99, 26, 23, 1, 2, 3, 29]
+        avl_tree = AVLTree()
+        tree = ArrayAVLTree(capacity=2)  # Forces the buffers to grow several times
+        for key in keys:
+            avl_tree.insert_node(key)
+            tree.insert_node(key)
+
+        stack = [(avl_tree.root, tree.root)]
+        while stack:
+            node, index = stack.pop()
+            if node is None:
+                self.assertEqual(index, 0)
+                continue
+            self.assertEqual(node.key, tree.keys[index])
+            self.assertEqual(node.height, tree.heights[index])
+            stack.append((node.left, tree.left[index]))
+            stack.append((node.right, tree.right[index]))
+
+    def test_search_node(self):
+        """Test that search returns True for present keys and False otherwise."""
+        tree = ArrayAVLTree()
+        for key in [50, 30, 70]:
+            tree.insert_node(key)
+
+        for key in [50, 30, 70]:
+            result = tree.search_key(key)
+            self.assertTrue(result)  # Should return True
+        self.assertFalse(tree.search_key(100))  # Should return False
+
+    def test_pickle(self):
+        """Test that the tree can be pickled and restored."""
+        tree = ArrayAVLTree()
+        for key in range(100):
+            tree.insert_node(key)
+
+        restored = pickle.loads(pickle.dumps(tree))
+        self.assertEqual(restored.root, tree.root)
+        for key in range(100):
+            self.assertTrue(restored.search_key(key))
+
+    def test_insert_many(self):
+        """Test that insert_many builds an empty tree directly and skips known and repeated keys."""
+        tree = ArrayAVLTree(capacity=2)
+        stats = tree.insert_many([30, 10, 20, 10])
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (3, 1, "build"))
+
+        stats = tree.insert_many(list(range(0, 100, 5)))
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (17, 3, "rebuild"))
+        self.assertEqual(list(tree), list(range(0, 100, 5)))
+
+        stats = tree.insert_many(np.array([96, 1, 5, 2]))  # Small batch for the tree
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (3, 1, "incremental"))
+        self.assertEqual(list(tree), sorted(set(range(0, 100, 5)) | {1, 2, 96}))
+        self.assertEqual(tree.search_many([96, 1, 3]).tolist(), [True, True, False])
+
+    def test_search_many(self):
+        """Test that search_many accepts NumPy arrays and answers in the input order."""
+        tree = ArrayAVLTree.from_sorted(range(0, 100, 2))
+        queries = np.array([98, 3, 0, 51, 50, 50])
+        self.assertEqual(tree.search_many(queries).tolist(), [True, False, True, False, True, True])
+
+        # Batches shared on the node indices, then small enough to search key by key
+        tree = ArrayAVLTree.from_sorted(range(0, 4000, 2))
+        for queries in (list(range(900, -100, -3)) + [10, 10], [4, 5, 3998, 4000]):
+            self.assertEqual(tree.search_many(queries).tolist(), [0 <= key < 4000 and key % 2 == 0 for key in queries])
+
+    def test_map_mode_is_rejected(self):
+        """Test that the map operations raise a TypeError, as the buffers only store keys."""
+        tree = ArrayAVLTree.from_sorted([1, 2, 3])
+        for operation in (lambda: tree[2], lambda: tree.get(2), lambda: tree.__setitem__(4, "d"),
+                          lambda: tree.__delitem__(2), lambda: tree.items()):
+            with self.assertRaisesRegex(TypeError, "only stores keys"):
+                operation()
+        self.assertEqual(list(tree), [1, 2, 3])
+
+    def test_generic_iterables_and_options(self):
+        """Test that search_many takes any iterable, and that from_sorted only takes a capacity."""
+        tree = ArrayAVLTree.from_sorted(range(0, 100, 2), capacity=200)
+        self.assertEqual(len(tree.keys), 200)
+        self.assertEqual(tree.search_many(key for key in (4, 5)).tolist(), [True, False])  # Key by key
+        self.assertEqual(tree.search_many(iter(range(100))).tolist(), [key % 2 == 0 for key in range(100)])  # NumPy
+        with self.assertRaisesRegex(TypeError, "order_stats"):
+            ArrayAVLTree.from_sorted([1, 2], order_stats=True)
+        with self.assertRaisesRegex(TypeError, "persistent"):
+            ArrayAVLTree.bulk_load([2, 1], persistent=True)
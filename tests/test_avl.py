@@ -1,3 +1,4 @@
+import random
 import unittest
 from src.avl_tree import AVLTree
 
@@ -6,6 +7,24 @@ class TestAVLTree(unittest.TestCase):
     Unit test class for the `AVLTree` class, using Python's built-in unittest framework.
     """
 
+    def check_balanced(self, node):
+        """
+        Checks that every node of the subtree has the right height and is balanced.
+
+        Parameters:
+        node (AVlNode): The root of the subtree.
+
+        Return:
+        int: The height of the subtree.
+        """
+        if not node:
+            return 0
+        left_height = self.check_balanced(node.left)
+        right_height = self.check_balanced(node.right)
+        self.assertLessEqual(abs(left_height - right_height), 1, f"Unbalanced node {node.key}")
+        self.assertEqual(node.height, 1 + max(left_height, right_height), f"Height error at node {node.key}")
+        return node.height
+
     def test_initialization(self):
         """Test if a new tree is initialized properly."""
         avl_tree = AVLTree()
@@ -56,9 +75,8 @@ class TestAVLTree(unittest.TestCase):
 
         # Test if the keys are present
         for key in [50, 30, 70]:
-            result, elapsed_time = avl_tree.search_key(key)
+            result = avl_tree.search_key(key)
             self.assertTrue(result)  # Should return True
-            self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
     def test_search_node_not_present(self):
         """Test that search returns False if key is not in the tree."""
@@ -70,9 +88,8 @@ class TestAVLTree(unittest.TestCase):
         avl_tree.insert_node(70)
 
         # Test if a key that wasn't inserted is not found
-        result, elapsed_time = avl_tree.search_key(100)
+        result = avl_tree.search_key(100)
         self.assertFalse(result)  # Should return False
-        self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
     def test_insert_balanced(self):
         """Test insertion maintains AVL tree balance"""
@@ -123,4 +140,175 @@ class TestAVLTree(unittest.TestCase):
             self.assertEqual(node.height, expected_height, f"Height error at node {node.key}")
             return expected_height
 
-        check_height(avl_tree.root)
\ No newline at end of file
+        check_height(avl_tree.root)
+
+    def test_bulk_load(self):
+        """Test that bulk_load builds a balanced tree with correct heights from unsorted keys."""
+        keys = [50, 10, 40, 20, 30, 70, 60, 10]
+        avl_tree = AVLTree.bulk_load(keys)
+
+        self.check_balanced(avl_tree.root)
+        self.assertEqual(avl_tree.root.key, 40)  # Middle of the 7 distinct keys
+        for key in keys:
+            self.assertTrue(avl_tree.search_key(key))
+
+    def test_order_statistics(self):
+        """Test rank, select, count_range and median on a tree with subtree sizes."""
+        avl_tree = AVLTree(order_stats=True)
+        keys = [50, 20, 80, 10, 30, 70, 90, 60, 40, 30]  # 30 is repeated and only stored once
+        for key in keys:
+            avl_tree.insert_node(key)
+
+        ordered = sorted(set(keys))
+        self.assertEqual(avl_tree.root.size, len(ordered))
+        for index, key in enumerate(ordered):
+            self.assertEqual(avl_tree.select(index), key)
+            self.assertEqual(avl_tree.rank(key), index)
+        self.assertEqual(avl_tree.rank(35), 3)
+        self.assertEqual(avl_tree.count_range(25, 70), 5)
+        self.assertEqual(avl_tree.median(), 50)
+        with self.assertRaises(IndexError):
+            avl_tree.select(len(ordered))
+
+        # Queries need the subtree sizes
+        with self.assertRaises(RuntimeError):
+            AVLTree().rank(10)
+
+    def test_iteration_and_range(self):
+        """Test in-order iteration, reversed iteration and range scans."""
+        avl_tree = AVLTree()
+        keys = [50, 20, 80, 10, 30, 70, 90, 60, 40]
+        for key in keys:
+            avl_tree.insert_node(key)
+
+        self.assertEqual(list(avl_tree), sorted(keys))
+        self.assertEqual(list(reversed(avl_tree)), sorted(keys, reverse=True))
+        self.assertEqual(list(avl_tree.range(25, 70)), [30, 40, 50, 60, 70])
+        self.assertEqual(list(avl_tree.range(91, 100)), [])
+        self.assertEqual(list(AVLTree().range(0, 10)), [])
+
+    def test_insert_many(self):
+        """Test that insert_many skips known and repeated keys and keeps the tree balanced."""
+        avl_tree = AVLTree()
+        stats = avl_tree.insert_many([30, 10, 20, 10])
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (3, 1, "build"))
+
+        stats = avl_tree.insert_many(list(range(0, 100, 5)))
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (17, 3, "rebuild"))
+        self.assertEqual(list(avl_tree), list(range(0, 100, 5)))
+        self.check_balanced(avl_tree.root)
+
+        stats = avl_tree.insert_many([96, 1, 5, 2])  # Small batch for the tree
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (3, 1, "sorted"))
+        self.assertEqual(list(avl_tree), sorted(set(range(0, 100, 5)) | {1, 2, 96}))
+        self.check_balanced(avl_tree.root)
+
+    def test_min_size(self):
+        """Test that min_size bounds the number of nodes from below, exactly with order statistics."""
+        self.assertEqual(AVLTree().min_size(), 0)
+        avl_tree = AVLTree()
+        for key in range(1000):
+            avl_tree.insert_node(key)
+        self.assertTrue(100 < avl_tree.min_size() <= 1000)
+        self.assertIsNone(avl_tree.collect_nodes(99))
+        self.assertEqual(AVLTree.from_sorted(list(range(1000)), order_stats=True).min_size(), 1000)
+
+    def test_search_many(self):
+        """Test that search_many answers a batch of queries in the input order."""
+        avl_tree = AVLTree()
+        for key in [50, 30, 70, 20, 40, 60, 80]:
+            avl_tree.insert_node(key)
+
+        queries = [80, 25, 20, 50, 90, 20, 0]
+        self.assertEqual(avl_tree.search_many(queries).tolist(), [True, False, True, True, False, True, False])
+        self.assertEqual(len(AVLTree().search_many(queries)), len(queries))
+        self.assertEqual(len(avl_tree.search_many([])), 0)
+
+        # A batch large enough to be sent down the tree together
+        avl_tree = AVLTree.bulk_load(range(0, 2000, 2))
+        queries = list(range(2100, -100, -3)) + [10, 10]
+        self.assertEqual(avl_tree.search_many(queries).tolist(), [0 <= key < 2000 and key % 2 == 0 for key in queries])
+
+    def test_delete_node(self):
+        """Test that deletion removes leaves, inner nodes and the root, keeping the tree balanced."""
+        avl_tree = AVLTree()
+        for key in [50, 30, 70, 20, 40, 60, 80, 10]:
+            avl_tree.insert_node(key)
+
+        avl_tree.delete_node(80)  # Leaf
+        avl_tree.delete_node(60)  # Leaf, unbalances the root to the left
+        self.assertEqual(avl_tree.root.key, 30)
+
+        avl_tree.delete_node(30)  # Root with two children
+        avl_tree.delete_node(100)  # Not present
+        self.assertEqual(list(avl_tree), [10, 20, 40, 50, 70])
+        self.assertFalse(avl_tree.search_key(30))
+        self.check_balanced(avl_tree.root)
+        for key in [10, 20, 40, 50, 70]:
+            avl_tree.delete_node(key)
+        self.assertIsNone(avl_tree.root)
+
+    def test_iterative_matches_recursive(self):
+        """Test that the iterative insert and delete build the same trees as the recursive ones."""
+        keys = random.Random(1).sample(range(10000), 300)
+        iterative, recursive = AVLTree(), AVLTree()
+
+        def shape(node):
+            if node is None:
+                return None
+            return (node.key, node.height, shape(node.left), shape(node.right))
+
+        for key in keys:
+            iterative.root = iterative.insert(iterative.root, key)
+            recursive.root = recursive.insert_recursive(recursive.root, key)
+        self.assertEqual(shape(iterative.root), shape(recursive.root))
+
+        for i, key in enumerate(keys[::2]):
+            iterative.root = iterative.delete(iterative.root, key)
+            recursive.root = recursive.delete_recursive(recursive.root, key)
+            if i % 25 == 0:
+                self.assertEqual(shape(iterative.root), shape(recursive.root))
+        self.assertEqual(shape(iterative.root), shape(recursive.root))
+
+    def test_map_mode(self):
+        """Test storing, replacing, reading and deleting values with the keys."""
+        avl_tree = AVLTree()
+        for key in [50, 30, 70, 20, 40]:
+            avl_tree[key] = str(key)
+        avl_tree[30] = "thirty"  # Replaces the value in place
+
+        self.assertEqual(avl_tree[30], "thirty")
+        self.assertEqual(avl_tree.get(40), "40")
+        self.assertIsNone(avl_tree.get(60))
+        self.assertEqual(avl_tree.get(60, "missing"), "missing")
+        with self.assertRaises(KeyError):
+            avl_tree[60]
+
+        del avl_tree[50]
+        with self.assertRaises(KeyError):
+            del avl_tree[50]
+        self.assertEqual(list(avl_tree.items()), [(20, "20"), (30, "thirty"), (40, "40"), (70, "70")])
+
+    def test_persistent_snapshot(self):
+        """Test that a snapshot keeps its keys and values while the persistent tree is modified."""
+        avl_tree = AVLTree(persistent=True)
+        for key in range(0, 100, 10):
+            avl_tree[key] = str(key)
+        snapshot = avl_tree.snapshot()
+
+        avl_tree.insert_node(55)
+        avl_tree.delete_node(30)
+        avl_tree.delete_node(avl_tree.root.key)  # Node with two children
+        avl_tree[20] = "twenty"
+
+        self.assertEqual(list(snapshot), list(range(0, 100, 10)))
+        self.assertEqual(list(snapshot.range(15, 45)), [20, 30, 40])
+        self.assertEqual(snapshot[20], "20")
+        self.assertTrue(snapshot.search_key(30))
+        self.assertFalse(snapshot.search_key(55))
+        self.assertEqual(avl_tree[20], "twenty")
+        self.assertNotIn(30, list(avl_tree))
+        with self.assertRaises(TypeError):
+            snapshot.insert_node(1)
+        with self.assertRaises(RuntimeError):
+            AVLTree().snapshot()  # Not persistent
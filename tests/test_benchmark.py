@@ -0,0 +1,163 @@
+import unittest
+from unittest import mock
+import numpy as np
+from src.benchmark import Benchmark
+from src.utils import Helper
+import src.avl_tree
+
+class TestBenchmark(unittest.TestCase):
+    """
+    Smoke tests of the `Benchmark` simulations and comparisons, on a tiny dataset.
+    """
+
+    def setUp(self):
+        """Builds a benchmark on a tiny dataset."""
+        dataset = {"random": np.random.default_rng(0).permutation(300) + 1, "skewed": np.arange(1, 301)}
+        self.b = Benchmark(dataset)
+
+    def test_measure_memory(self):
+        """Test that the nodes with a __dict__ take more memory than the slotted ones, which are restored."""
+        results = self.b.measure_memory()
+        for struc_key in ("AVL", "RB", "Treap"):
+            self.assertGreater(results[struc_key]["dict"], results[struc_key]["slots"])
+        self.assertEqual(list(results["ArrayAVL"]), ["slots"])
+        self.assertFalse(hasattr(src.avl_tree.AVlNode(1), "__dict__"))
+
+    def test_simulate_bulk_build(self):
+        """Test that the bulk build is timed against the incremental build for every distribution and structure."""
+        results = self.b.simulate_bulk_build()
+        self.assertEqual(list(results), ["random", "skewed"])
+        for structures in results.values():
+            self.assertEqual(list(structures), list(self.b.structures))
+            for times in structures.values():
+                self.assertGreater(times["incremental"], 0)
+                self.assertGreater(times["bulk"], 0)
+
+    def test_compare_order_statistics(self):
+        """Test that the indexed and scanned queries are timed for the selected trees with order statistics."""
+        b = Benchmark(self.b.dataset, structures=["RB", "ArrayAVL"])
+        results = b.compare_order_statistics('skewed')
+        self.assertEqual(list(results), ["RB"])
+        self.assertEqual(list(results["RB"]), ["rank", "select", "count_range", "median"])
+        for timings in results["RB"].values():
+            self.assertEqual(sorted(timings), ["indexed", "scan"])
+
+    def test_simulate_batch_merge(self):
+        """Test that insert_many rebuilds a tree faster than per-key insertions when the batch is as large as the tree."""
+        results = self.b.simulate_batch_merge('random', tree_size=100, batch_sizes=[10, 100, 500])
+        self.assertEqual(list(results), list(self.b.structures))
+        for batches in results.values():
+            self.assertEqual(list(batches), [10, 100])  # The dataset has no room for 500 more keys
+            self.assertEqual(batches[100]["strategy"], "rebuild")
+
+        keys = np.random.default_rng(0).permutation(40000) + 1
+        b = Benchmark({"random": keys}, structures=["AVL"])
+        results = b.simulate_batch_merge('random', tree_size=20000, batch_sizes=[20000])
+        self.assertGreater(results["AVL"][20000]["batched"], results["AVL"][20000]["per_key"])
+
+    def test_simulate_batch_insertion(self):
+        """Test that the batched and per-key insertions are timed for every distribution and structure."""
+        results = self.b.simulate_batch_insertion(batch_size=100)
+        self.assertEqual(list(results), ["random", "skewed"])
+        for structures in results.values():
+            self.assertEqual(list(structures), list(self.b.structures))
+            for throughput in structures.values():
+                self.assertGreater(throughput["per_key"], 0)
+                self.assertGreater(throughput["batched"], 0)
+
+    def test_simulate_batch_search(self):
+        """Test that search_many is timed for every tree, and that it answers a batch as large as the tree faster than per key."""
+        results = self.b.simulate_batch_search()
+        self.assertEqual(list(results), ["random", "skewed"])
+        for structures in results.values():
+            self.assertEqual(list(structures), list(self.b.structures))
+
+        keys = np.random.default_rng(0).permutation(20000) + 1
+        b = Benchmark({"random": keys}, structures=["AVL", "ArrayAVL"])
+        results = b.simulate_batch_search(queries=keys)
+        for struc_key in ("AVL", "ArrayAVL"):
+            self.assertGreater(results["random"][struc_key]["batched"], results["random"][struc_key]["per_key"])
+
+    def test_simulate_deletion(self):
+        """Test that the delete throughput is measured for the trees supporting delete_node."""
+        results = self.b.simulate_deletion()
+        self.assertEqual(list(results), ["random", "skewed"])
+        for structures in results.values():
+            self.assertEqual(list(structures), ["AVL", "RB", "Treap"])  # ArrayAVL can't delete
+            for throughput in structures.values():
+                self.assertGreater(throughput, 0)
+        self.assertIs(self.b.results_deletion, results)
+
+    def test_compare_priority_sources(self):
+        """Test that a Treap is measured with every priority source."""
+        results = self.b.compare_priority_sources('skewed')
+        self.assertEqual(list(results), ["narrow", "random", "batched", "hash"])
+        for measures in results.values():
+            self.assertGreater(measures["insert"], 0)
+            self.assertGreater(measures["search"], 0)
+            self.assertGreaterEqual(measures["max_depth"], measures["average_depth"])
+            self.assertGreaterEqual(measures["average_depth"], 1)
+
+    def test_measure_snapshots(self):
+        """Test that the snapshots are timed against a deep copy, and that the persistent writes allocate more."""
+        results = self.b.measure_snapshots(n_updates=50)
+        self.assertEqual(list(results), ["AVL", "Treap"])
+        for measures in results.values():
+            self.assertGreater(measures["deepcopy"], measures["snapshot"])
+            self.assertGreater(measures["persistent_bytes_per_update"], measures["ephemeral_bytes_per_update"])
+
+    def test_simulate_concurrent_reads(self):
+        """Test that the reads and writes are counted for every structure, locked and copy-on-write."""
+        results = self.b.simulate_concurrent_reads(n_readers=2)
+        self.assertEqual(list(results), list(self.b.structures) + ["AVL (COW)", "Treap (COW)"])
+        for throughput in results.values():
+            self.assertGreaterEqual(throughput["reads"], 0)  # The writer may finish before a read batch
+            self.assertGreater(throughput["writes"], 0)
+
+    def test_simulate_parallel(self):
+        """Test that the parallel runner searches the selected distribution and only saves when asked."""
+        b = Benchmark({"random": self.b.dataset["random"], "skewed": self.b.dataset["skewed"][:200]},
+                      structures=["AVL", "Treap"])
+        with mock.patch.object(Helper, "save_insert_results") as save_insert, \
+             mock.patch.object(Helper, "save_search_results") as save_search:
+            b.simulate_parallel(n_steps=2, max_workers=2, distrib_key='skewed', save=False)
+        save_insert.assert_not_called()
+        save_search.assert_not_called()
+        self.assertEqual(b.sizes_search.tolist(), [100, 200])
+        for struc_key in ("AVL", "Treap"):
+            self.assertEqual(len(b.results_search[struc_key]), 2)
+            self.assertEqual(len(b.results_insertion["random"][struc_key]), 300)
+            self.assertEqual(len(b.results_insertion["skewed"][struc_key]), 200)
+
+    def test_compare_engines(self):
+        """Test that the iterative and recursive engines are timed for every tree keeping a recursive reference."""
+        results = self.b.compare_engines('skewed')
+        self.assertEqual(list(results), ["AVL", "RB", "Treap"])
+        for operations in results.values():
+            self.assertIn("insert", operations)
+            self.assertIn("search", operations)
+            for engines in operations.values():
+                self.assertEqual(list(engines), ["recursive", "iterative"])
+                self.assertGreater(engines["iterative"], 0)
+
+    def test_compare_map_mode(self):
+        """Test that the map and dict+tree layouts are measured for the trees storing values."""
+        results = self.b.compare_map_mode()
+        self.assertEqual(list(results), ["AVL", "RB", "Treap"])  # ArrayAVL only stores keys
+        for layouts in results.values():
+            self.assertEqual(list(layouts), ["map", "dict+tree"])
+            for measures in layouts.values():
+                self.assertGreater(measures["bytes_per_key"], 0)
+                self.assertGreater(measures["build"], 0)
+                self.assertGreater(measures["lookup"], 0)
+
+    def test_compare_sharding(self):
+        """Test that a single tree and a forest of 2 shards in worker processes insert and find the whole dataset."""
+        b = Benchmark(self.b.dataset, structures=["AVL", "ArrayAVL"])
+        results = b.compare_sharding('skewed', n_shards=2, batch_size=100)
+        self.assertEqual(list(results), ["AVL"])  # The shards need order statistics
+        for layout in ("single", "sharded"):
+            self.assertGreater(results["AVL"][layout]["insert"], 0)
+            self.assertGreater(results["AVL"][layout]["search"], 0)
+        self.assertEqual(len(results["AVL"]["shard_sizes"]), 2)
+        self.assertEqual(sum(results["AVL"]["shard_sizes"]), 300)
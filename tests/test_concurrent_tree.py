@@ -0,0 +1,85 @@
+import threading
+import unittest
+from src.avl_tree import AVLTree
+from src.concurrent_tree import ConcurrentTree, ReadWriteLock
+from src.rb_tree import RBTree
+from src.treap import Treap
+
+class TestConcurrentTree(unittest.TestCase):
+    """
+    Unit test class for the `ConcurrentTree` wrapper and its `ReadWriteLock`.
+    """
+
+    def run_writer_and_readers(self, tree, n_readers=4, n_keys=2000):
+        """Inserts keys from a writer thread while readers check that they see a consistent tree."""
+        errors = []
+        done = threading.Event()
+
+        def writer():
+            for key in range(n_keys):
+                tree.insert_node(key)
+            done.set()
+
+        def reader():
+            try:
+                seen = 0
+                while not done.is_set():
+                    keys = tree.keys()
+                    # The writer inserts the keys in order, so a consistent state holds a prefix of them
+                    self.assertEqual(keys, list(range(len(keys))))
+                    self.assertGreaterEqual(len(keys), seen)
+                    seen = len(keys)
+                    if keys:
+                        self.assertTrue(tree.search_key(keys[-1]))
+            except AssertionError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=reader) for _ in range(n_readers)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(tree.keys(), list(range(n_keys)))
+
+    def test_read_write_lock(self):
+        """Test the wrapper of non-persistent trees, guarded by the readers-writer lock."""
+        for tree_class in (AVLTree, RBTree, Treap):
+            tree = ConcurrentTree(tree_class())
+            self.assertFalse(tree.copy_on_write)
+            self.run_writer_and_readers(tree)
+
+    def test_copy_on_write(self):
+        """Test the wrapper of persistent trees, whose readers use the published snapshot."""
+        for tree_class in (AVLTree, Treap):
+            tree = ConcurrentTree(tree_class(persistent=True))
+            self.assertTrue(tree.copy_on_write)
+            self.run_writer_and_readers(tree)
+
+    def test_map_operations(self):
+        """Test the map mode and range operations through the wrapper."""
+        tree = ConcurrentTree(AVLTree(persistent=True))
+        for key in [5, 1, 3]:
+            tree[key] = key * 10
+        del tree[1]
+        self.assertEqual(tree[3], 30)
+        self.assertIsNone(tree.get(1))
+        self.assertEqual(tree.items(), [(3, 30), (5, 50)])
+        self.assertEqual(tree.range(2, 4), [3])
+        self.assertEqual(tree.search_many([5, 1]).tolist(), [True, False])
+
+    def test_writer_excludes_readers(self):
+        """Test that a writer waits for the readers, and readers wait for the writer."""
+        lock = ReadWriteLock()
+        events = []
+        lock.acquire_read()
+        writer = threading.Thread(target=lambda: (lock.acquire_write(), events.append("write"), lock.release_write()))
+        writer.start()
+        writer.join(timeout=0.1)
+        self.assertTrue(writer.is_alive())  # Blocked by the reader
+        events.append("read")
+        lock.release_read()
+        writer.join()
+        self.assertEqual(events, ["read", "write"])
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.dataset_generator import DatasetGenerator
+from src.utils import Helper
+
+class TestDatasetGenerator(unittest.TestCase):
+    """
+    Unit test class for the `DatasetGenerator` class.
+    """
+
+    def test_permutation(self):
+        """Test that the Feistel permutation is a bijection of the indexes, for any size."""
+        for size in [1, 2, 3, 17, 1000, 4097]:
+            generator = DatasetGenerator(size, seed=size)
+            positions = generator.permute(np.arange(size))
+            self.assertEqual(sorted(positions.tolist()), list(range(size)))
+
+    def test_distinct_keys_in_range(self):
+        """Test that both distributions hold distinct keys in the range, in a shuffled order."""
+        size = 20000
+        dataset = DatasetGenerator(size, seed=1, chunk_size=1000).generate()
+        for distrib_key, keys in dataset.items():
+            self.assertEqual(len(np.unique(keys)), size, distrib_key)
+            self.assertGreaterEqual(keys.min(), 1)
+            self.assertLess(keys.max(), 100 * size)
+            self.assertLess(abs(np.corrcoef(np.arange(size), keys)[0, 1]), 0.05)  # Not produced in order
+
+        # Half of the skewed keys fall below the median of the exponential distribution
+        median = -np.log((1 + np.exp(-2.0)) / 2) / 2.0 * (100 * size - 1) + 1
+        self.assertAlmostEqual(np.mean(dataset['skewed'] < median), 0.5, delta=0.02)
+        self.assertAlmostEqual(np.mean(dataset['random'] < 50 * size), 0.5, delta=0.02)
+
+    def test_write(self):
+        """Test writing a dataset straight into the binary format."""
+        with tempfile.TemporaryDirectory() as folder:
+            path = DatasetGenerator(5000, seed=2, chunk_size=700).write(os.path.join(folder, "dataset5K"))
+            expected = DatasetGenerator(5000, seed=2, chunk_size=700).generate()
+            loaded = Helper.read_dataset(path, mmap=False)
+            self.assertEqual(list(loaded), ["random", "skewed"])
+            for distrib_key, keys in loaded.items():
+                np.testing.assert_array_equal(keys, expected[distrib_key])
@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["matplotlib", "seaborn", "scipy", "sklearn"]
+
+class TestImports(unittest.TestCase):
+    """
+    Unit test class guarding the import time of the package: the data structures, and the benchmark
+    until it plots, must not load the plotting and fitting libraries.
+    """
+
+    def import_in_fresh_interpreter(self, modules):
+        """Imports the modules in a new Python process, returning the import time and the heavy modules loaded."""
+        code = (
+            "import importlib, json, sys, time\n"
+            "start = time.perf_counter()\n"
+            f"for module in {modules!r}:\n"
+            "    importlib.import_module(module)\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"print(json.dumps({{'elapsed': elapsed, 'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+        )
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        return json.loads(output.stdout)
+
+    def test_tree_modules(self):
+        """Test that the data structures import quickly, without the heavy libraries."""
+        modules = ["src.avl_tree", "src.rb_tree", "src.treap", "src.array_avl_tree",
+                   "src.concurrent_tree", "src.sharded_forest", "src.snapshot"]
+        result = self.import_in_fresh_interpreter(modules)
+        self.assertEqual(result["heavy"], [])
+        self.assertLess(result["elapsed"], 1.5)  # About 0.15s, mostly NumPy
+
+    def test_benchmark_modules(self):
+        """Test that the benchmark and its helpers only load the heavy libraries when plotting."""
+        result = self.import_in_fresh_interpreter(["src.benchmark", "src.utils", "src.dataset_generator"])
+        self.assertEqual(result["heavy"], [])
@@ -0,0 +1,65 @@
+import unittest
+from src.avl_tree import AVLTree
+from src.base_tree import BaseTree
+from src.instrumentation import Instrumentation
+from src.rb_tree import RBTree
+from src.treap import Treap
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Unit test class for the `Instrumentation` class and the instrumentation switches of `BaseTree`.
+    """
+
+    def test_disabled_by_default(self):
+        """Test that the operations return their plain results and are not wrapped."""
+        tree = AVLTree()
+        self.assertIsNone(tree.instrumentation)
+        self.assertIsNone(tree.insert_node(10))
+        self.assertIs(tree.search_key(10), True)
+        self.assertNotIn("insert_node", tree.__dict__)
+
+    def test_per_tree_instrumentation(self):
+        """Test that an instrumented tree records its timings without affecting other trees."""
+        tree, other = RBTree(), RBTree()
+        instrumentation = tree.enable_instrumentation(Instrumentation(capacity=2))  # Forces the buffers to grow
+        for key in range(5):
+            self.assertIsNone(tree.insert_node(key))
+            other.insert_node(key)
+        self.assertTrue(tree.search_key(3))
+        tree.delete_node(3)
+
+        self.assertIs(tree.instrumentation, instrumentation)
+        self.assertIsNone(other.instrumentation)
+        self.assertEqual(len(instrumentation.timings("insert_node")), 5)
+        self.assertEqual(len(instrumentation.timings("search_key")), 1)
+        self.assertEqual(len(instrumentation.timings("delete_node")), 1)
+        self.assertTrue((instrumentation.timings("insert_node") > 0).all())
+
+        tree.disable_instrumentation()
+        tree.insert_node(10)
+        self.assertIsNone(tree.instrumentation)
+        self.assertEqual(len(instrumentation.timings("insert_node")), 5)
+
+        instrumentation.reset()
+        self.assertEqual(len(instrumentation.timings("insert_node")), 0)
+
+    def test_global_instrumentation(self):
+        """Test that global instrumentation times every tree and is fully removed when disabled."""
+        plain_insert = AVLTree.insert_node
+        instrumentation = BaseTree.enable_global_instrumentation()
+        try:
+            for tree_class in (AVLTree, RBTree, Treap):
+                tree = tree_class()
+                self.assertIs(tree.instrumentation, instrumentation)
+                tree.insert_node(1)
+                self.assertTrue(tree.search_key(1))
+            self.assertEqual(len(instrumentation.timings("insert_node")), 3)
+            self.assertEqual(len(instrumentation.timings("search_key")), 3)
+        finally:
+            BaseTree.disable_global_instrumentation()
+
+        self.assertIs(AVLTree.insert_node, plain_insert)
+        self.assertNotIn("search_key", AVLTree.__dict__)
+        self.assertIsNone(AVLTree().instrumentation)
+        AVLTree().insert_node(1)
+        self.assertEqual(len(instrumentation.timings("insert_node")), 3)
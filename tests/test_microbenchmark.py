@@ -0,0 +1,73 @@
+import gc
+import os
+import unittest
+import numpy as np
+from src.benchmark import Benchmark
+from src.microbenchmark import Microbenchmark
+
+class TestMicrobenchmark(unittest.TestCase):
+    """
+    Unit test class for the `Microbenchmark` harness.
+    """
+
+    def test_warmup_and_trials(self):
+        """Test that the function runs warmup + trials times, with the garbage collector off while timed."""
+        calls, gc_states = [], []
+        harness = Microbenchmark(warmup=3, trials=7)
+        timings = harness.measure(lambda: (calls.append(1), gc_states.append(gc.isenabled())), n_ops=2)
+        self.assertEqual(len(calls), 10)
+        self.assertEqual(gc_states, [True] * 3 + [False] * 7)
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(timings.shape, (7,))
+
+    def test_gc_restored_on_error(self):
+        """Test that the garbage collector is enabled again if the timed function raises."""
+        def failing():
+            raise KeyError("boom")
+
+        with self.assertRaises(KeyError):
+            Microbenchmark(warmup=0, trials=3).measure(failing)
+        self.assertTrue(gc.isenabled())
+
+    def test_summary(self):
+        """Test the ordering of the statistics and their reproducibility."""
+        timings = np.random.default_rng(1).lognormal(size=50)
+        harness = Microbenchmark()
+        stats = harness.summarize(timings)
+        self.assertEqual(stats["trials"], 50)
+        self.assertAlmostEqual(stats["median"], np.median(timings))
+        self.assertLessEqual(stats["q1"], stats["median"])
+        self.assertLessEqual(stats["median"], stats["q3"])
+        self.assertLessEqual(stats["ci_low"], stats["median"])
+        self.assertLessEqual(stats["median"], stats["ci_high"])
+        self.assertAlmostEqual(stats["iqr"], stats["q3"] - stats["q1"])
+        self.assertEqual(harness.summarize(timings), stats)
+
+    def test_invalid_trials(self):
+        """Test that a harness without trials is rejected."""
+        with self.assertRaises(ValueError):
+            Microbenchmark(trials=0)
+
+    @unittest.skipUnless(hasattr(os, "sched_setaffinity"), "CPU pinning needs os.sched_setaffinity")
+    def test_pinned(self):
+        """Test that the process runs on the chosen CPU while measuring, then gets its affinity back."""
+        previous = os.sched_getaffinity(0)
+        cpu = min(previous)
+        affinities = []
+        Microbenchmark(warmup=0, trials=2, cpu=cpu).measure(lambda: affinities.append(os.sched_getaffinity(0)))
+        self.assertEqual(affinities, [{cpu}, {cpu}])
+        self.assertEqual(os.sched_getaffinity(0), previous)
+
+    def test_search_statistics(self):
+        """Test the statistics of the search simulation measured with the harness."""
+        dataset = {"random": list(range(1, 201))}
+        b = Benchmark(dataset, structures=["AVL", "RB"])
+        b.simulate_search(4, save=False, harness=Microbenchmark(warmup=1, trials=5))
+        self.assertEqual(b.sizes_search.tolist(), [50, 100, 150, 200])
+        for struc_key, stats in b.stats_search.items():
+            times = b.results_search[struc_key]
+            self.assertEqual(sorted(stats), ["ci_high", "ci_low", "q1", "q3"])
+            self.assertTrue((stats["ci_low"] <= times).all() and (times <= stats["ci_high"]).all())
+
+        b.simulate_search(2, save=False)  # Without the harness, no spread is reported
+        self.assertEqual(b.stats_search, {})
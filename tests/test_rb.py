@@ -1,3 +1,4 @@
+import random
 import unittest
 from src.rb_tree import RBTree
 
@@ -62,9 +63,8 @@ class TestRBTree(unittest.TestCase):
 
         # Test if the keys are present
         for key in [50, 30, 70]:
-            result, elapsed_time = rb_tree.search_key(key)
+            result = rb_tree.search_key(key)
             self.assertTrue(result)  # Should return True
-            self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
     def test_search_node_not_present(self):
         """Test that search returns False if key is not in the tree."""
@@ -76,9 +76,8 @@ class TestRBTree(unittest.TestCase):
         rb_tree.insert_node(70)
 
         # Test if a key that wasn't inserted is not found
-        result, elapsed_time = rb_tree.search_key(100)
+        result = rb_tree.search_key(100)
         self.assertFalse(result)  # Should return False
-        self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
     def test_bst_property(self):
         """Test Treap maintains the BST property"""
@@ -125,4 +124,178 @@ class TestRBTree(unittest.TestCase):
                 return -1  # Indicating violation
             return left_height + (1 if node.color == 'B' else 0)
 
-        self.assertNotEqual(black_height(rb_tree.root), -1)
\ No newline at end of file
+        self.assertNotEqual(black_height(rb_tree.root), -1)
+
+    def test_compact_node_color(self):
+        """Test that nodes store their color as a boolean and carry no __dict__."""
+        rb_tree = RBTree()
+        for key in [10, 20, 30, 15]:
+            rb_tree.insert_node(key)
+
+        self.assertIs(rb_tree.root.red, False)  # Root must be black
+        self.assertIs(rb_tree.root.left.right.red, True)
+        self.assertEqual(rb_tree.root.left.right.color, 'R')
+        self.assertFalse(hasattr(rb_tree.root, '__dict__'))
+
+    def test_bulk_load(self):
+        """Test that bulk_load builds a tree satisfying the red-black properties."""
+        for size in [0, 1, 2, 5, 8, 15, 16, 100]:
+            rb_tree = RBTree.bulk_load(range(size, 0, -1))
+
+            def black_height(node):
+                if node is None:
+                    return 1
+                if node.red:
+                    self.assertFalse(node.left and node.left.red)
+                    self.assertFalse(node.right and node.right.red)
+                for child in (node.left, node.right):
+                    if child is not None:
+                        self.assertIs(child.parent, node)
+                left_height = black_height(node.left)
+                self.assertEqual(left_height, black_height(node.right))
+                return left_height + (0 if node.red else 1)
+
+            black_height(rb_tree.root)
+            if size:
+                self.assertFalse(rb_tree.root.red)  # Root must be black
+            for key in range(1, size + 1):
+                self.assertTrue(rb_tree.search_key(key))
+
+    def test_order_statistics(self):
+        """Test rank, select, count_range and median on a tree with subtree sizes."""
+        rb_tree = RBTree(order_stats=True)
+        keys = [10, 20, 30, 15, 25, 5, 1, 40, 35]
+        for key in keys:
+            rb_tree.insert_node(key)
+
+        def check_size(node):
+            if node is None:
+                return 0
+            size = 1 + check_size(node.left) + check_size(node.right)
+            self.assertEqual(node.size, size, f"Size error at node {node.key}")
+            return size
+
+        check_size(rb_tree.root)
+        ordered = sorted(keys)
+        for index, key in enumerate(ordered):
+            self.assertEqual(rb_tree.select(index), key)
+            self.assertEqual(rb_tree.rank(key), index)
+        self.assertEqual(rb_tree.count_range(10, 30), 5)
+        self.assertEqual(rb_tree.count_range(31, 34), 0)
+        self.assertEqual(rb_tree.median(), 20)
+
+    def test_insert_many(self):
+        """Test that insert_many skips known and repeated keys and keeps the red-black properties."""
+        rb_tree = RBTree()
+        stats = rb_tree.insert_many([30, 10, 20, 10])
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (3, 1, "build"))
+
+        def black_height(node):
+            if not node:
+                return 1
+            for child in (node.left, node.right):
+                if child:
+                    self.assertIs(child.parent, node, f"Parent error at node {child.key}")
+                    self.assertFalse(node.color == 'R' and child.color == 'R', f"Red node {node.key} has a red child")
+            left_height = black_height(node.left)
+            self.assertEqual(left_height, black_height(node.right), f"Black height error at node {node.key}")
+            return left_height + (node.color == 'B')
+
+        rb_tree[10] = "ten"
+        stats = rb_tree.insert_many(list(range(0, 100, 5)))
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (17, 3, "rebuild"))
+        self.assertEqual(list(rb_tree), list(range(0, 100, 5)))
+        self.assertEqual(rb_tree[10], "ten")  # The nodes are reused with their values
+        self.assertEqual(rb_tree.root.color, 'B')
+        self.assertIsNone(rb_tree.root.parent)
+        black_height(rb_tree.root)
+
+        stats = rb_tree.insert_many([96, 1, 5, 2])  # Small batch for the tree
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (3, 1, "sorted"))
+        self.assertEqual(list(rb_tree), sorted(set(range(0, 100, 5)) | {1, 2, 96}))
+        self.assertIsNone(rb_tree.root.parent)
+        black_height(rb_tree.root)
+
+    def test_min_size(self):
+        """Test that min_size bounds the number of nodes from below, exactly with order statistics."""
+        self.assertEqual(RBTree().min_size(), 0)
+        rb_tree = RBTree()
+        for key in range(1000):
+            rb_tree.insert_node(key)
+        self.assertTrue(100 < rb_tree.min_size() <= 1000)
+        self.assertIsNone(rb_tree.collect_nodes(99))
+        self.assertEqual(RBTree.from_sorted(list(range(1000)), order_stats=True).min_size(), 1000)
+
+    def test_delete_node(self):
+        """Test that deletion keeps the red-black properties and the parent pointers."""
+        rb_tree = RBTree()
+        keys = list(range(1, 32))
+        for key in keys:
+            rb_tree.insert_node(key)
+
+        rb_tree.delete_node(16)
+        rb_tree.delete_node(100)  # Not present
+        self.assertFalse(rb_tree.search_key(16))
+
+        def black_height(node):
+            if node is None:
+                return 1
+            for child in (node.left, node.right):
+                if child:
+                    self.assertIs(child.parent, node, f"Parent error at node {child.key}")
+                    self.assertFalse(node.color == 'R' and child.color == 'R', f"Red node {node.key} has a red child")
+            left_height = black_height(node.left)
+            self.assertEqual(left_height, black_height(node.right), f"Black height error at node {node.key}")
+            return left_height + (node.color == 'B')
+
+        remaining = [key for key in keys if key != 16]
+        for key in [1, 31, 8, 24, 4, 12, 20, 28, 2, 3]:
+            rb_tree.delete_node(key)
+            remaining.remove(key)
+            self.assertEqual(list(rb_tree), remaining)
+            self.assertEqual(rb_tree.root.color, 'B')
+            self.assertIsNone(rb_tree.root.parent)
+            black_height(rb_tree.root)
+
+        for key in remaining:
+            rb_tree.delete_node(key)
+        self.assertIsNone(rb_tree.root)
+
+    def test_iterative_matches_recursive(self):
+        """Test that insert, called directly on the tree, builds the same trees as insert_recursive."""
+        keys = random.Random(1).sample(range(10000), 300)
+        iterative, recursive = RBTree(), RBTree()
+
+        def shape(node):
+            if node is None:
+                return None
+            for child in (node.left, node.right):
+                if child:
+                    self.assertIs(child.parent, node, f"Parent error at node {child.key}")
+            return (node.key, node.color, shape(node.left), shape(node.right))
+
+        for key in keys:
+            iterative.root = iterative.insert(iterative.root, key)
+            recursive.root = recursive.finish_root(recursive.insert_recursive(recursive.root, key))
+            self.assertEqual(iterative.root.color, 'B')
+            self.assertIsNone(iterative.root.parent)
+        self.assertEqual(shape(iterative.root), shape(recursive.root))
+
+    def test_map_mode(self):
+        """Test storing, replacing, reading and deleting values with the keys."""
+        rb_tree = RBTree()
+        for key in [50, 30, 70, 20, 40]:
+            rb_tree[key] = str(key)
+        rb_tree[30] = "thirty"  # Replaces the value in place
+
+        self.assertEqual(rb_tree[30], "thirty")
+        self.assertEqual(rb_tree.get(40), "40")
+        self.assertIsNone(rb_tree.get(60))
+        self.assertEqual(rb_tree.get(60, "missing"), "missing")
+        with self.assertRaises(KeyError):
+            rb_tree[60]
+
+        del rb_tree[50]
+        with self.assertRaises(KeyError):
+            del rb_tree[50]
+        self.assertEqual(list(rb_tree.items()), [(20, "20"), (30, "thirty"), (40, "40"), (70, "70")])
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from src.avl_tree import AVLTree
+from src.rb_tree import RBTree
+from src.sharded_forest import ShardedForest
+from src.treap import Treap
+
+class TestShardedForest(unittest.TestCase):
+    """
+    Unit test class for the `ShardedForest` class.
+    """
+
+    def test_batches_and_range_scans(self):
+        """Test routed inserts, searches and range scans across the shards of every tree structure."""
+        keys = np.random.default_rng(1).permutation(3000)[:2000]
+        expected = sorted(keys.tolist())
+        for tree_class in (AVLTree, RBTree, Treap):
+            with ShardedForest(tree_class, n_shards=3, boundaries=[1000, 2000]) as forest:
+                stats = forest.insert_many(keys)
+                stats = forest.insert_many(np.concatenate([keys[:10], keys[:10]]))
+                self.assertEqual((stats["inserted"], stats["skipped"]), (0, 20))
+
+                self.assertEqual(len(forest), 2000)
+                self.assertEqual(list(forest), expected)
+                queries = np.arange(-5, 3005)
+                self.assertEqual(forest.search_many(queries).tolist(), [key in set(expected) for key in queries.tolist()])
+                self.assertTrue(forest.search_key(expected[0]))
+                self.assertFalse(forest.search_key(-1))
+                # A range spanning the three shards, one inside a shard, and an empty one
+                self.assertEqual(forest.range(500, 2500), [key for key in expected if 500 <= key <= 2500])
+                self.assertEqual(forest.range(1200, 1300), [key for key in expected if 1200 <= key <= 1300])
+                self.assertEqual(forest.range(10, 5), [])
+
+    def test_rebalance_on_skewed_keys(self):
+        """Test that the boundaries follow a skewed key distribution, keeping the shards even."""
+        rng = np.random.default_rng(2)
+        with ShardedForest(AVLTree, n_shards=4, sample_size=2000) as forest:
+            forest.insert_many(rng.integers(0, 1000, 2000))  # The first batch sets the boundaries
+            skewed = rng.exponential(100000, 20000).astype(np.int64) + 1000
+            forest.insert_many(skewed)
+
+            self.assertGreaterEqual(forest.rebalances, 1)
+            self.assertLess(max(forest.counts), 2 * len(forest) / 4)
+            self.assertEqual(list(forest), sorted(set(forest.range(-1, 10 ** 9))))
+            self.assertEqual(sum(forest.counts), len(list(forest)))
+
+    def test_boundaries_on_duplicated_keys(self):
+        """Test that heavily repeated keys give strictly ascending boundaries and no empty shard."""
+        rng = np.random.default_rng(3)
+        with ShardedForest(AVLTree, n_shards=4, sample_size=2000, rebalance_factor=None) as forest:
+            boundaries = forest.quantiles(np.concatenate([np.full(9000, 7), rng.integers(0, 10 ** 6, 1000)]))
+            self.assertTrue(np.all(np.diff(boundaries) > 0))
+            self.assertGreater(boundaries[0], 7)  # The repeated key lands in the first shard
+            self.assertEqual(forest.quantiles(np.full(100, 7)).tolist(), [8, 9, 10])  # Not enough distinct keys
+
+            forest.insert_many(np.concatenate([np.full(9000, 7), rng.integers(0, 10 ** 6, 1000)]))
+            self.assertTrue(np.all(np.diff(forest.boundaries) > 0))
+            self.assertLess(max(forest.counts), 2 * len(forest) / 4)
+            forest.rebalance_factor = 2.0
+            for _ in range(3):
+                forest.insert_many(np.concatenate([np.full(9000, 7), rng.integers(0, 10 ** 6, 1000)]))
+            self.assertEqual(forest.rebalances, 0)
+            self.assertGreater(min(forest.counts), 0)
+
+    def test_invalid_boundaries(self):
+        """Test that the number of boundaries must match the number of shards."""
+        with self.assertRaises(ValueError):
+            ShardedForest(n_shards=2, boundaries=[1, 2])
@@ -1,4 +1,6 @@
+import random
 import unittest
+from src.priority import BatchedPriority, HashPriority, RandomPriority
 from src.treap import Treap
 
 class TestTreap(unittest.TestCase):
@@ -16,9 +18,8 @@ class TestTreap(unittest.TestCase):
 
         # Test if the keys are present
         for key in [50, 30, 70]:
-            result, elapsed_time = treap.search_key(key)
+            result = treap.search_key(key)
             self.assertTrue(result)  # Should return True
-            self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
     def test_insert_node_not_present(self):
         """Test that search returns False if key is not in the treap."""
@@ -30,9 +31,8 @@ class TestTreap(unittest.TestCase):
         treap.insert_node(70)
 
         # Test if a key that wasn't inserted is not found
-        result, elapsed_time = treap.search_key(100)
+        result = treap.search_key(100)
         self.assertFalse(result)  # Should return False
-        self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
     def test_delete_node(self):
         """Test if keys are deleted correctly from the treap."""
@@ -45,15 +45,14 @@ class TestTreap(unittest.TestCase):
         
         # Test if the keys are present
         for key in [50, 30, 70]:
-            result, elapsed_time = treap.search_key(key)
+            result = treap.search_key(key)
             self.assertTrue(result)  # Should return True
-            self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
         # Delete node and check the result
         treap.delete_node(30)
-        self.assertFalse(treap.search_key(30)[0])  # Should return False after deletion
-        self.assertTrue(treap.search_key(50)[0])   # 50 should still be present
-        self.assertTrue(treap.search_key(70)[0])   # 70 should still be present
+        self.assertFalse(treap.search_key(30))  # Should return False after deletion
+        self.assertTrue(treap.search_key(50))   # 50 should still be present
+        self.assertTrue(treap.search_key(70))   # 70 should still be present
 
     def test_delete_node_not_present(self):
         """Test deleting a non-existent node."""
@@ -66,26 +65,23 @@ class TestTreap(unittest.TestCase):
         
         # Test if the keys are present
         for key in [50, 30, 70]:
-            result, elapsed_time = treap.search_key(key)
+            result = treap.search_key(key)
             self.assertTrue(result)  # Should return True
-            self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
         # Delete a non-existent node (e.g., 100)
         treap.delete_node(100)
         # Test if the keys are present
         for key in [50, 30, 70]:
-            result, elapsed_time = treap.search_key(key)
+            result = treap.search_key(key)
             self.assertTrue(result)  # Should return True
-            self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
     def test_empty_treap_search(self):
         """Test searching on an empty treap."""
         #Setup the Treap object for each test.
         treap = Treap()
         # Search in an empty treap
-        result, elapsed_time = treap.search_key(10)
+        result = treap.search_key(10)
         self.assertFalse(result)  # Should return False
-        self.assertGreater(elapsed_time, 0)  # Ensure some time was taken
 
     def test_structure(self):
         """Test structure: Keeping BST property for keys and Max-Heap property for priorities"""
@@ -128,4 +124,208 @@ class TestTreap(unittest.TestCase):
                 return False
             return is_bst(node.left, min_val, node.key) and is_bst(node.right, node.key, max_val)
 
-        self.assertTrue(is_bst(treap.root), "BST property violated!")
\ No newline at end of file
+        self.assertTrue(is_bst(treap.root), "BST property violated!")
+
+    def test_bulk_load(self):
+        """Test that bulk_load builds a treap keeping the BST and Max-Heap properties."""
+        keys = [15, 3, 42, 8, 23, 16, 4, 99, 1]
+        treap = Treap.bulk_load(keys)
+
+        def check(node, min_val=float('-inf'), max_val=float('inf')):
+            if not node:
+                return 0
+            self.assertTrue(min_val < node.key < max_val, "BST property violated!")
+            for child in (node.left, node.right):
+                if child:
+                    self.assertGreaterEqual(node.priority, child.priority)
+            return 1 + check(node.left, min_val, node.key) + check(node.right, node.key, max_val)
+
+        self.assertEqual(check(treap.root), len(keys))
+
+    def test_split_and_join(self):
+        """Test splitting a treap around a key and joining the halves back."""
+        treap = Treap.bulk_load([10, 20, 30, 40, 50])
+        left, right = treap.split(30)
+        self.assertIsNone(treap.root)  # The nodes moved to the new treaps
+        for key in [10, 20]:
+            self.assertTrue(left.search_key(key))
+            self.assertFalse(right.search_key(key))
+        for key in [30, 40, 50]:
+            self.assertTrue(right.search_key(key))
+            self.assertFalse(left.search_key(key))
+
+        joined = Treap.join(left, right)
+        for key in [10, 20, 30, 40, 50]:
+            self.assertTrue(joined.search_key(key))
+
+        # The keys of left must be smaller than the keys of right
+        with self.assertRaises(ValueError):
+            Treap.join(Treap.bulk_load([60]), Treap.bulk_load([5]))
+
+    def test_set_operations(self):
+        """Test union, intersection and difference of two treaps."""
+        first, second = {1, 3, 5, 7, 9, 11}, {3, 4, 5, 6, 11, 12}
+        operations = {
+            'union': first | second,
+            'intersection': first & second,
+            'difference': first - second,
+        }
+        for operation, expected in operations.items():
+            treap, other = Treap.bulk_load(first), Treap.bulk_load(second)
+            getattr(treap, operation)(other)
+            self.assertIsNone(other.root)  # The other treap is consumed
+            for key in range(15):
+                self.assertEqual(treap.search_key(key), key in expected, f"{operation}: key {key}")
+
+    def test_order_statistics(self):
+        """Test that subtree sizes stay correct through inserts, deletes and set operations."""
+        treap = Treap(order_stats=True)
+        for key in [50, 20, 80, 10, 30, 70, 90, 60, 40]:
+            treap.insert_node(key)
+        treap.delete_node(80)
+        treap.delete_node(15)  # Not present
+
+        ordered = [10, 20, 30, 40, 50, 60, 70, 90]
+        for index, key in enumerate(ordered):
+            self.assertEqual(treap.select(index), key)
+            self.assertEqual(treap.rank(key), index)
+        self.assertEqual(treap.count_range(20, 60), 5)
+        self.assertEqual(treap.median(), 40)
+
+        treap.union(Treap.bulk_load([5, 45, 95]))  # The other treap has no sizes
+        self.assertEqual(treap.root.size, 11)
+        self.assertEqual(treap.rank(46), 6)
+        self.assertEqual(treap.select(10), 95)
+
+    def test_iteration_on_deep_treap(self):
+        """Test that iteration and range scans don't recurse, even on a deep treap built from sorted keys."""
+        treap = Treap(priority_source=RandomPriority(bits=7))  # Colliding priorities
+        size = 20000
+        for key in range(size):
+            treap.insert_node(key)
+
+        self.assertEqual(sum(1 for _ in treap), size)
+        self.assertEqual(next(reversed(treap)), size - 1)
+        self.assertEqual(list(treap.range(100, 104)), [100, 101, 102, 103, 104])
+
+    def test_insert_many(self):
+        """Test that insert_many links or rebuilds the treap and skips known and repeated keys."""
+        treap = Treap(order_stats=True)
+        stats = treap.insert_many([30, 10, 20, 10])
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (3, 1, "build"))
+
+        stats = treap.insert_many(list(range(0, 100, 5)))
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (17, 3, "rebuild"))
+        self.assertEqual(list(treap), list(range(0, 100, 5)))
+        self.assertEqual(treap.root.size, 20)
+
+        stats = treap.insert_many([96, 1, 5, 2])  # Small batch for the treap
+        self.assertEqual((stats["inserted"], stats["skipped"], stats["strategy"]), (3, 1, "sorted"))
+        self.assertEqual(list(treap), sorted(set(range(0, 100, 5)) | {1, 2, 96}))
+        self.assertEqual(treap.root.size, 23)
+        for node in treap.iter_nodes(treap.root):
+            for child in (node.left, node.right):
+                self.assertFalse(child and child.priority > node.priority, f"Heap error at node {node.key}")
+
+    def test_insert_many_on_deep_treap(self):
+        """Test that merging a batch into a deep Treap does not hit the recursion limit."""
+        treap = Treap(priority_source=RandomPriority(bits=1))  # Colliding priorities
+        for key in range(3000):
+            treap.insert_node(key)
+        stats = treap.insert_many(range(-1, 6000, 2))
+        self.assertEqual(stats["inserted"], 1501)
+        self.assertEqual(list(treap), sorted(set(range(3000)) | set(range(-1, 6000, 2))))
+
+    def test_set_operations_on_deep_treaps(self):
+        """Test that the intersection and difference of deep Treaps do not hit the recursion limit."""
+        expected = {'intersection': set(range(0, 3000, 2)), 'difference': set(range(1, 3000, 2))}
+        for operation, keys in expected.items():
+            treap, other = (Treap(priority_source=RandomPriority(bits=1)) for _ in range(2))  # Colliding priorities
+            for key in range(3000):
+                treap.insert_node(key)
+            for key in range(0, 6000, 2):
+                other.insert_node(key)
+            getattr(treap, operation)(other)
+            self.assertEqual(list(treap), sorted(keys), operation)
+
+    def test_iterative_matches_recursive(self):
+        """Test that the iterative insert and delete build the same treaps as the recursive ones."""
+        keys = random.Random(1).sample(range(10000), 300)
+        iterative, recursive = Treap(priority_source=HashPriority()), Treap(priority_source=HashPriority())
+
+        def shape(node):
+            if node is None:
+                return None
+            return (node.key, node.priority, shape(node.left), shape(node.right))
+
+        for key in keys:
+            iterative.root = iterative.insert(iterative.root, key)
+            recursive.root = recursive.insert_recursive(recursive.root, key)
+        self.assertEqual(shape(iterative.root), shape(recursive.root))
+
+        for i, key in enumerate(keys[::2]):
+            iterative.root = iterative.delete(iterative.root, key)
+            recursive.root = recursive.delete_recursive(recursive.root, key)
+            if i % 25 == 0:
+                self.assertEqual(shape(iterative.root), shape(recursive.root))
+        self.assertEqual(shape(iterative.root), shape(recursive.root))
+
+    def test_map_mode(self):
+        """Test storing, replacing, reading and deleting values with the keys."""
+        treap = Treap()
+        for key in [50, 30, 70, 20, 40]:
+            treap[key] = str(key)
+        treap[30] = "thirty"  # Replaces the value in place
+
+        self.assertEqual(treap[30], "thirty")
+        self.assertEqual(treap.get(40), "40")
+        self.assertIsNone(treap.get(60))
+        self.assertEqual(treap.get(60, "missing"), "missing")
+        with self.assertRaises(KeyError):
+            treap[60]
+
+        del treap[50]
+        with self.assertRaises(KeyError):
+            del treap[50]
+        self.assertEqual(list(treap.items()), [(20, "20"), (30, "thirty"), (40, "40"), (70, "70")])
+
+    def test_priority_sources(self):
+        """Test the priority sources and their effect on the depth of the Treap."""
+        keys = list(range(2000))
+        reports = {}
+        for name, source in [("narrow", RandomPriority(bits=2)), ("random", RandomPriority()),
+                             ("batched", BatchedPriority(batch_size=100)), ("hash", HashPriority())]:
+            treap = Treap(priority_source=source)
+            for key in keys:
+                treap.insert_node(key)
+            self.assertEqual(list(treap), keys)
+            reports[name] = treap.depth_report()
+            self.assertEqual(reports[name]["nodes"], len(keys))
+
+        # Colliding priorities make the Treap degenerate, wide ones keep it logarithmic
+        self.assertGreater(reports["narrow"]["max_depth"], 100)
+        for name in ("random", "batched", "hash"):
+            self.assertLess(reports[name]["average_depth"], 30, name)
+
+        # Hashed priorities give the same shape whatever the insertion order
+        treap = Treap.bulk_load(reversed(keys), priority_source=HashPriority())
+        self.assertEqual(treap.depth_report(), reports["hash"])
+        self.assertEqual(treap.root.priority, HashPriority()(treap.root.key))
+
+    def test_persistent_snapshot(self):
+        """Test that a snapshot keeps its keys while the persistent treap is modified."""
+        treap = Treap(persistent=True, order_stats=True)
+        for key in range(0, 100, 10):
+            treap.insert_node(key)
+        snapshot = treap.snapshot()
+
+        treap.insert_node(55)
+        for key in [0, 30, 50, 90]:
+            treap.delete_node(key)
+
+        self.assertEqual(list(snapshot), list(range(0, 100, 10)))
+        self.assertEqual(snapshot.select(3), 30)
+        self.assertEqual(list(treap), [10, 20, 40, 55, 60, 70, 80])
+        self.assertEqual(treap.select(3), 55)
+        with self.assertRaises(RuntimeError):
+            treap.union(Treap())  # Would modify the shared nodes
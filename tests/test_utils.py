@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from src.avl_tree import AVLTree
+from src.benchmark import Benchmark
+from src.utils import Helper
+
+class TestDatasetFormat(unittest.TestCase):
+    """
+    Unit test class for the binary dataset format of the `Helper` class.
+    """
+
+    def test_convert_and_memory_map(self):
+        """Test converting a JSON dataset and reading it back memory-mapped."""
+        dataset = {"random": [7, 3, 2 ** 40, 1], "skewed": [1, 2, 3, 5]}
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, "dataset4.json")
+            with open(filename, "w") as file:
+                json.dump(dataset, file)
+
+            path = Helper.convert_json_dataset(filename)
+            self.assertEqual(path, os.path.join(folder, "dataset4"))
+            loaded = Helper.read_dataset(path)
+            self.assertEqual(list(loaded), ["random", "skewed"])
+            for distrib_key, keys in loaded.items():
+                self.assertIsInstance(keys, np.memmap)
+                self.assertEqual(keys.dtype, np.int64)
+                self.assertEqual(keys.tolist(), dataset[distrib_key])
+            del loaded, keys  # Releases the mapped files
+
+            self.assertEqual(Helper.read_dataset(filename), dataset)
+
+    def test_iter_chunks(self):
+        """Test that the chunks hold Python ints, usable as tree keys."""
+        keys = np.arange(10, dtype=np.int64)
+        chunks = list(Helper.iter_chunks(keys, chunk_size=4))
+        self.assertEqual(chunks, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        self.assertIs(type(chunks[0][0]), int)
+        self.assertEqual(list(AVLTree.bulk_load(keys[::-1])), list(range(10)))
+
+
+class TestColumnarResults(unittest.TestCase):
+    """
+    Unit test class for the columnar results format of the `Helper` class.
+    """
+
+    def test_save_and_read_columns(self):
+        """Test saving columns with their metadata and reading them back, whole and downsampled."""
+        columns = {"random.AVL": np.cumsum(np.full(1000, 0.5)), "random.RB": np.arange(1000.0)}
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "insert_results_1000")
+            Helper.save_columns(path, columns, {"simulation": "insertion"})
+
+            metadata, loaded, indexes = Helper.read_columns(path)
+            self.assertEqual(metadata, {"simulation": "insertion", "columns": {"random.AVL": 1000, "random.RB": 1000}})
+            for name, values in columns.items():
+                self.assertIsInstance(loaded[name], np.memmap)
+                np.testing.assert_array_equal(loaded[name], values)
+            np.testing.assert_array_equal(indexes, np.arange(1000))
+
+            _, loaded, indexes = Helper.read_columns(path, max_points=300)
+            self.assertEqual(len(indexes), 250)  # One value every 4
+            np.testing.assert_array_equal(loaded["random.AVL"], columns["random.AVL"][indexes])
+            del loaded  # Releases the mapped files
+
+    def test_search_results_statistics(self):
+        """Test that the spread of the search times is saved and read back with the times."""
+        exec_times = {"AVL": np.array([1.0, 2.0]), "RB": np.array([1.5, 2.5])}
+        statistics = {struc_key: {"ci_low": times - 0.1, "ci_high": times + 0.1} for struc_key, times in exec_times.items()}
+        with tempfile.TemporaryDirectory() as folder:
+            with mock.patch.object(Helper, "results_path", lambda name: os.path.join(folder, name)):
+                self.assertTrue(Helper.save_search_results(exec_times, np.array([10, 20]), statistics))
+                results = Helper.read_search_results(os.listdir(folder)[0])
+            for struc_key, stats in statistics.items():
+                np.testing.assert_array_equal(results["Exec_times"][struc_key], exec_times[struc_key])
+                for stat, values in stats.items():
+                    np.testing.assert_array_equal(results["Stats"][struc_key][stat], values)
+            del results  # Releases the mapped files
+
+    def test_block_timed_insert_results(self):
+        """Test that the block-timed insertion curves keep their dataset sizes once saved and read back."""
+        b = Benchmark({"random": np.arange(1, 101), "skewed": np.arange(100, 0, -1)}, structures=["AVL", "Treap"])
+        with tempfile.TemporaryDirectory() as folder:
+            with mock.patch.object(Helper, "results_path", lambda name: os.path.join(folder, name)):
+                b.simulate_insertion(block_size=32)
+                results, sizes = Helper.read_insert_results(os.listdir(folder)[0])
+            self.assertEqual(len(os.listdir(folder)), 1)
+            self.assertTrue(os.listdir(folder)[0].startswith("insert_results_100_"))
+            np.testing.assert_array_equal(sizes, [31, 63, 95, 99])
+            for distrib_key, structures in b.results_insertion.items():
+                for struc_key, times in structures.items():
+                    self.assertEqual(len(times), 4)
+                    self.assertTrue((np.diff(times) >= 0).all())  # Cumulative
+                    np.testing.assert_array_equal(results[distrib_key][struc_key], times)
+            del results  # Releases the mapped files